@@ -0,0 +1,110 @@
+"""
+Name Matching Benchmark
+
+Re-matches cached suggestions for a synthetic roster offline, the way
+preprocessing validates them: once stopping at the first match per player, then
+checking every footballer suggestion against the already prepared matchers. A
+sample is also checked the old way, rebuilding the player's variations for every
+suggestion, to show the gap. No network access is needed.
+
+Example:
+    python src/scripts/benchmark_name_matching.py --players 50000
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+os.environ['TRENDS_BACKEND'] = 'simulated'
+
+from trends_simulator import SyntheticPopulation
+import preprocess_players as pp
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=50000, help='Synthetic roster size')
+    parser.add_argument('--seed', type=int, default=42, help='Population seed')
+    parser.add_argument('--baseline-players', type=int, default=2000,
+                        help='Players also matched by rebuilding variations per suggestion')
+    return parser.parse_args()
+
+
+def cached_suggestions(population: SyntheticPopulation) -> List[Tuple[Dict, List[List[Dict]]]]:
+    """Each player with the suggestions of its search terms, as a suggestion cache holds them"""
+    roster = []
+    for player in population.players:
+        team = player['statistics'][0]['team']['name']
+        roster.append((player, [population.suggestions(term)
+                                for term in pp.get_search_terms(player, team)]))
+    return roster
+
+
+def resolve(roster: List[Tuple[Dict, List[List[Dict]]]],
+            matchers: List[pp.NameMatcher]) -> List[Optional[Dict]]:
+    """First matching suggestion per player, searching terms in order as preprocessing does"""
+    topics = []
+    for matcher, (_, suggestion_lists) in zip(matchers, roster):
+        topic = None
+        for suggestions in suggestion_lists:
+            topic = pp.match_suggestions(matcher, suggestions)
+            if topic:
+                break
+        topics.append(topic)
+    return topics
+
+
+def name_checks(roster: List[Tuple[Dict, List[List[Dict]]]]) -> List[Tuple[int, str]]:
+    """(player index, title) of every suggestion that passes the type check"""
+    return [
+        (index, suggestion['title'])
+        for index, (_, suggestion_lists) in enumerate(roster)
+        for suggestions in suggestion_lists
+        for suggestion in suggestions
+        if pp.is_valid_player_type(suggestion['type'].lower())
+    ]
+
+
+def main():
+    args = parse_args()
+    print(f"Building {args.players} synthetic players and their cached suggestions...")
+    population = SyntheticPopulation(size=args.players, seed=args.seed)
+    roster = cached_suggestions(population)
+    suggestion_count = sum(len(suggestions) for _, lists in roster for suggestions in lists)
+    checks = name_checks(roster)
+
+    pp.normalize_for_comparison.cache_clear()
+    start = time.perf_counter()
+    matchers = [pp.NameMatcher(player) for player, _ in roster]
+    topics = resolve(roster, matchers)
+    resolve_seconds = time.perf_counter() - start
+    resolved = sum(1 for topic in topics if topic)
+
+    start = time.perf_counter()
+    indexed = [matchers[index].matches(title) for index, title in checks]
+    warm_seconds = time.perf_counter() - start
+
+    print(f"\nPlayers: {len(roster)}, suggestions: {suggestion_count}, "
+          f"name checks: {len(checks)}, resolved: {resolved}")
+    print(f"First-match resolve, cold matchers: {resolve_seconds:.2f}s "
+          f"({resolve_seconds / len(roster) * 1e6:.1f} us/player)")
+    print(f"Every name check, warm matchers:    {warm_seconds:.2f}s "
+          f"({warm_seconds / max(len(checks), 1) * 1e6:.2f} us/check)")
+
+    sample = [(index, title) for index, title in checks if index < args.baseline_players]
+    if sample:
+        pp.normalize_for_comparison.cache_clear()
+        start = time.perf_counter()
+        rebuilt = [pp.is_name_match(roster[index][0], {'title': title}) for index, title in sample]
+        rebuild_seconds = time.perf_counter() - start
+        if rebuilt != indexed[:len(sample)]:
+            raise SystemExit("Per-suggestion matching disagrees with the matcher index")
+        per_check = rebuild_seconds / len(sample)
+        print(f"Rebuilding variations per check:    {per_check * 1e6:.2f} us/check on "
+              f"{len(sample)} checks, {per_check * len(checks) / max(warm_seconds, 1e-9):.0f}x "
+              f"the warm matcher")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Pipeline Memory Benchmark
+
+Runs the roster pipeline on synthetic players in a temporary workspace: stored
+API pages are assembled into the saved roster and its changeset, then
+preprocessed against a warm topic cache, so no API calls are made. Reports the
+traced peak memory of each stage at a baseline and a full roster size, next to
+the memory the full roster takes when held as a list. No network access is
+needed.
+
+Example:
+    python src/scripts/benchmark_pipeline_memory.py --players 100000
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, Tuple
+
+os.environ['TRENDS_BACKEND'] = 'simulated'
+
+from player_store import PlayerStore
+from roster_pages import RosterPages
+from run_journal import PreprocessJournal
+from topic_cache import TopicCache
+from trends_simulator import iter_players
+import fetch_players as fp
+import preprocess_players as pp
+
+PAGE_SIZE = 20  # Players per API-Football page
+SEASON = 2024
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100000, help='Synthetic roster size')
+    parser.add_argument('--baseline-players', type=int, default=10000,
+                        help='Smaller roster measured for comparison')
+    parser.add_argument('--seed', type=int, default=42, help='Population seed')
+    return parser.parse_args()
+
+
+def configure_run(workdir: str):
+    """Point both scripts at a fresh workspace sharing one player store"""
+    store = PlayerStore(os.path.join(workdir, 'players.sqlite'))
+    fp.roster_pages = RosterPages(os.path.join(workdir, 'roster_pages.sqlite'))
+    fp.player_store = store
+    fp.OUTPUT_FILE = os.path.join(workdir, 'players.json')
+    fp.CHANGES_FILE = os.path.join(workdir, 'players_changes.json')
+    pp.player_store = store
+    pp.INPUT_FILE = fp.OUTPUT_FILE
+    pp.OUTPUT_FILE = os.path.join(workdir, 'preprocessed_players.json')
+    pp.topic_cache = TopicCache(os.path.join(workdir, 'topic_cache.sqlite'))
+    pp.preprocess_journal = PreprocessJournal(os.path.join(workdir, 'preprocess_journal.ndjson'))
+
+
+def store_pages(size: int, seed: int) -> Dict[int, Tuple[int, int]]:
+    """Store the population as API pages per league; returns the league heads"""
+    counts = Counter(player['statistics'][0]['league']['id'] for player in iter_players(size, seed))
+    totals = {league_id: -(-count // PAGE_SIZE) for league_id, count in counts.items()}
+
+    pages: Dict[int, list] = {league_id: [] for league_id in counts}
+    numbers = Counter()
+    for player in iter_players(size, seed):
+        league_id = player['statistics'][0]['league']['id']
+        pages[league_id].append(player)
+        if len(pages[league_id]) == PAGE_SIZE:
+            numbers[league_id] += 1
+            fp.roster_pages.put(league_id, SEASON, numbers[league_id], totals[league_id], pages[league_id])
+            pages[league_id] = []
+    for league_id, players in pages.items():
+        if players:
+            numbers[league_id] += 1
+            fp.roster_pages.put(league_id, SEASON, numbers[league_id], totals[league_id], players)
+    return {league_id: (SEASON, total) for league_id, total in totals.items()}
+
+
+def measure(fn: Callable[[], object]) -> Tuple[float, float]:
+    """Traced peak memory in MB and wall time of fn, with its output silenced"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6, seconds
+
+
+def run_size(size: int, seed: int) -> Dict[str, Tuple[float, float]]:
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_run(workdir)
+        heads = store_pages(size, seed)
+        pp.topic_cache.seed(iter_players(size, seed))
+        calls_before = pp.api_call_count
+
+        results = {
+            'fetch': measure(lambda: fp.save_players_data(fp.iter_roster(heads))),
+            'preprocess': measure(pp.preprocess_players),
+            'roster list': measure(lambda: list(fp.iter_roster(heads))),
+        }
+        if pp.api_call_count != calls_before:
+            raise SystemExit(f"Preprocessing made {pp.api_call_count - calls_before} API calls")
+        return results
+
+
+def main():
+    args = parse_args()
+    sizes = sorted({args.baseline_players, args.players})
+    results = {}
+    for size in sizes:
+        print(f"Running the pipeline on {size} synthetic players...")
+        results[size] = run_size(size, args.seed)
+
+    print(f"\n{'Stage':<28}" + ''.join(f"{size:>22}" for size in sizes))
+    for stage, label in [('fetch', 'Fetch: pages to roster'),
+                         ('preprocess', 'Preprocess: roster to topics'),
+                         ('roster list', 'Roster held as a list')]:
+        cells = ''.join(f" {results[size][stage][0]:>9.1f} MB {results[size][stage][1]:>7.1f}s"
+                        for size in sizes)
+        print(f"{label:<28}{cells}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,70 @@
+"""
+Player News
+
+Fetches the latest news for the top trending players and summarises it with
+Gemini. Players are handled concurrently, and each player's two search queries
+(topic title, then player name as a fallback) run at the same time, so the stage
+takes about one search plus one summary instead of one per player.
+
+By default each player is summarised on their own as soon as their news
+arrives. NEWS_SUMMARY_MODE=batch summarises every player's articles in one
+Gemini request with a JSON response schema instead; players missing from the
+answer, or the whole batch when it is blocked, fall back to one request per
+player.
+GEMINI_API_ENDPOINT points the client at another endpoint, such as a local
+gemini_simulator.py.
+"""
+
 from gnews import GNews
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 import os
 import re
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from summary_cache import SummaryCache, summary_key
+
+GEMINI_API_ENDPOINT = os.environ.get('GEMINI_API_ENDPOINT')
+if GEMINI_API_ENDPOINT:
+    genai.configure(api_key=os.environ['GOOGLE_API_KEY'], transport='rest',
+                    client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+else:
+    genai.configure(api_key=os.environ['GOOGLE_API_KEY'])
+MODEL_NAME = 'gemini-2.0-flash'
+MODEL = genai.GenerativeModel(MODEL_NAME)
+SUMMARY_MODE = os.environ.get('NEWS_SUMMARY_MODE', 'per_player')  # 'per_player' or 'batch'
+TOP_PLAYERS = 5
+MAX_ARTICLES = 10
+SUMMARY_MAX_TOKENS = 100
+BATCH_TOKENS_PER_PLAYER = 150  # A summary plus its share of the JSON around it
+
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_ONLY_HIGH,
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH
+}
+
+# Batched answers: one summary per player ID given in the prompt
+BATCH_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {
+            'id': {'type': 'STRING'},
+            'summary': {'type': 'STRING'},
+        },
+        'required': ['id', 'summary'],
+    },
+}
 
-genai.configure(api_key=os.environ['GOOGLE_API_KEY'])
-MODEL = genai.GenerativeModel('gemini-2.0-flash')
+# Searches run here, apart from the per-player tasks waiting on them
+search_executor = ThreadPoolExecutor(max_workers=2 * TOP_PLAYERS)
+
+# Summaries of unchanged news, and the last good one per topic
+summary_cache = SummaryCache()
 
 def clean_title(title):
     """Remove source names and clean up the title"""
@@ -24,22 +80,38 @@ def clean_description(desc):
     desc = re.sub(r'http\S+', '', desc)
     return desc.strip()
 
-def generate_trend_summary(news_articles, player_name, topic_title):
-    """Generate a summary using Google Gemini"""
-    print(f"\nGenerating summary for {topic_title}...")
-    start_time = time.time()
-    
+def format_articles(news_articles):
+    return "\n\n".join([
+        f"Title: {article['title']}\nDescription: {article['description']}"
+        for article in news_articles
+    ])
+
+def lookup_trend_summary(news_articles, topic_title):
+    """Default or cached summary of a player's articles, or None, with their cache key"""
     if not news_articles:
-        print("No news articles found, returning default message")
-        return "No recent news available."
+        print(f"No news articles found for {topic_title}, returning default message")
+        return "No recent news available.", None
     
-    print(f"Found {len(news_articles)} articles to summarize")
-    
-    print("Preparing content...")
-    news_content = "\n\n".join([
-        f"Title: {article['title']}\nDescription: {article['description']}"
+    key = summary_key(MODEL_NAME, topic_title, [
+        (clean_title(article.get('title', '')), clean_description(article.get('description', '')))
         for article in news_articles
     ])
+    cached = summary_cache.get(key)
+    if cached is not None:
+        print(f"Reusing cached summary for {topic_title}, its articles are unchanged")
+    return cached, key
+
+def generate_trend_summary(news_articles, player_name, topic_title):
+    """Generate a summary using Google Gemini, or reuse the one for the same articles"""
+    summary, key = lookup_trend_summary(news_articles, topic_title)
+    if summary is not None:
+        return summary
+    return request_trend_summary(news_articles, player_name, topic_title, key)
+
+def request_trend_summary(news_articles, player_name, topic_title, key):
+    """Summarise one player's articles in their own Gemini request"""
+    print(f"Generating summary for {topic_title} from {len(news_articles)} articles...")
+    news_content = format_articles(news_articles)
     
     prompt = f"""Recent news about {topic_title}:
 
@@ -59,7 +131,6 @@ Double-check all competition names, scores, and events against the source articl
 
 Summary:"""
     
-    print("Calling Gemini API for summary...")
     api_start = time.time()
     
     try:
@@ -67,14 +138,9 @@ Summary:"""
             prompt,
             generation_config=genai.types.GenerationConfig(
                 temperature=0.5,
-                max_output_tokens=100
+                max_output_tokens=SUMMARY_MAX_TOKENS
             ),
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_ONLY_HIGH
-            }
+            safety_settings=SAFETY_SETTINGS
         )
         
         if response.prompt_feedback.block_reason:
@@ -82,53 +148,149 @@ Summary:"""
             return f"Recent news available for {player_name}. Please check sports news websites for the latest updates."
             
         api_duration = time.time() - api_start
-        print(f"API call took {api_duration:.2f} seconds")
+        print(f"Summary for {topic_title} took {api_duration:.2f} seconds")
+        summary_cache.put(key, topic_title, response.text)
         return response.text
         
     except Exception as e:
-        print(f"Error calling Gemini API: {str(e)}")
+        print(f"Error calling Gemini API for {topic_title}: {str(e)}")
+        last_good = summary_cache.last_good(topic_title)
+        if last_good is not None:
+            print(f"Falling back to the last good summary for {topic_title}")
+            return last_good
         return "Unable to generate summary at this time."
 
-def fetch_news_for_player(player_name, topic_title):
-    """Fetch news for a specific player using their name and topic title"""
-    print(f"\nFetching news for {player_name}...")
-    start_time = time.time()
+def request_batch_summaries(entries, keys):
+    """Summarise several players' articles in one Gemini request.
+
+    Returns {entry index: summary} for the players whose summary came back
+    non-empty. Players left out of the answer, or all of them when the request is
+    blocked or the answer is not valid JSON, are left for per-player requests.
+    """
+    ids = [f"P{index + 1}" for index in range(len(entries))]
+    sections = "\n\n".join(
+        f"ID: {player_id}\nPlayer: {entry['topic_title']}\n\n{format_articles(entry['articles'])}"
+        for player_id, entry in zip(ids, entries)
+    )
+    
+    prompt = f"""Recent news about {len(entries)} footballers, each under its ID:
+
+{sections}
+
+For each ID, as an elite sports journalist, write a gripping 2-3 sentence summary that captures that player's latest headlines.
+IMPORTANT: Only include facts that are explicitly mentioned in that player's news articles.
+Focus on the most newsworthy elements, such as:
+- Match performances or key moments (be specific about competitions)
+- Transfer rumors and contract talks
+- Injuries or fitness updates
+- Off-field developments or controversies
+- Career milestones or achievements
+
+Use powerful, journalistic language that draws readers in, but maintain strict factual accuracy.
+Double-check all competition names, scores, and events against the source articles.
+
+Answer with one entry per ID, holding the ID and that player's summary."""
+    
+    print(f"Generating summaries for {len(entries)} players in one request...")
+    api_start = time.time()
+    
+    try:
+        response = MODEL.generate_content(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.5,
+                max_output_tokens=BATCH_TOKENS_PER_PLAYER * len(entries),
+                response_mime_type='application/json',
+                response_schema=BATCH_SCHEMA
+            ),
+            safety_settings=SAFETY_SETTINGS
+        )
+        
+        if response.prompt_feedback.block_reason:
+            print("Batched summaries filtered by safety system")
+            return {}
+        answer = json.loads(response.text)
+    except Exception as e:
+        print(f"Error calling Gemini API for batched summaries: {str(e)}")
+        return {}
+    
+    print(f"Batched summaries took {time.time() - api_start:.2f} seconds")
+    answered = {}
+    for item in answer if isinstance(answer, list) else []:
+        if isinstance(item, dict) and isinstance(item.get('summary'), str) and item['summary'].strip():
+            answered.setdefault(item.get('id'), item['summary'].strip())
+    
+    summaries = {}
+    for index, (player_id, entry) in enumerate(zip(ids, entries)):
+        if player_id in answered:
+            summaries[index] = answered[player_id]
+            summary_cache.put(keys[index], entry['topic_title'], answered[player_id])
+        else:
+            print(f"No batched summary for {entry['topic_title']}")
+    return summaries
+
+def batch_trend_summaries(entries, executor):
+    """Summaries of every fetched player, in order: cached ones reused, the rest
+    from one batched request, and per-player requests for any it left out"""
+    summaries = [None] * len(entries)
+    keys = [None] * len(entries)
+    for index, entry in enumerate(entries):
+        summaries[index], keys[index] = lookup_trend_summary(entry['articles'], entry['topic_title'])
+    
+    pending = [index for index, summary in enumerate(summaries) if summary is None]
+    if len(pending) > 1:
+        batched = request_batch_summaries([entries[index] for index in pending],
+                                          [keys[index] for index in pending])
+        for position, summary in batched.items():
+            summaries[pending[position]] = summary
+        pending = [index for index in pending if summaries[index] is None]
     
-    print(f"Using topic title: {topic_title}")
+    def request(index):
+        entry = entries[index]
+        return request_trend_summary(entry['articles'], entry['player_name'], entry['topic_title'], keys[index])
     
+    for index, summary in zip(pending, executor.map(request, pending)):
+        summaries[index] = summary
+    return summaries
+
+def search_news(search_query):
+    """Articles for one query, with its own client so queries can run in parallel"""
     gn = GNews(
         period='1d',
-        max_results=10,
+        max_results=MAX_ARTICLES,
         exclude_websites=[]
     )
+    search_start = time.time()
+    articles = gn.get_news(search_query)
+    print(f"Search {search_query} took {time.time() - search_start:.2f} seconds")
+    return articles or []
+
+def fetch_news_for_player(player_name, topic_title):
+    """Fetch news for a specific player using their name and topic title.
+
+    Both queries start together; topic title results are preferred and the
+    player name results are only waited for when those come back empty.
+    """
+    start_time = time.time()
+    queries = [f'"{topic_title}" football', f'"{player_name}" football']
+    searches = [search_executor.submit(search_news, query) for query in queries]
     
-    try:
-        search_query = f'"{topic_title}" football'
-        print(f"Searching with query: {search_query}")
-        search_start = time.time()
-        articles = gn.get_news(search_query)
-        search_duration = time.time() - search_start
-        print(f"Search took {search_duration:.2f} seconds")
-        
-        if not articles:
-            print("No articles found with topic title, trying player name...")
-            search_query = f'"{player_name}" football'
-            print(f"New search query: {search_query}")
-            search_start = time.time()
-            articles = gn.get_news(search_query)
-            search_duration = time.time() - search_start
-            print(f"Second search took {search_duration:.2f} seconds")
-            
-        found_count = len(articles[:10]) if articles else 0
-        print(f"Found {found_count} articles")
-        
-        total_duration = time.time() - start_time
-        print(f"Total news fetch took {total_duration:.2f} seconds")
-        
-        return articles[:10] if articles else []
-    except Exception as e:
-        print(f"Error fetching news for {player_name}: {str(e)}")
-        return []
+    articles = []
+    for query, search in zip(queries, searches):
+        try:
+            articles = search.result()
+        except Exception as e:
+            print(f"Error fetching news for {player_name} with query {query}: {str(e)}")
+            continue
+        if articles:
+            break
+        print(f"No articles found with query {query}")
+    for search in searches:
+        search.cancel()
+    
+    print(f"Found {len(articles[:MAX_ARTICLES])} articles for {player_name} "
+          f"in {time.time() - start_time:.2f} seconds")
+    return articles[:MAX_ARTICLES]
 
 def get_preferred_name(player_info):
     """Get the commonly used name for a player"""
@@ -150,6 +312,53 @@ def get_preferred_name(player_info):
     # Fallback to first + last name
     return f"{firstname} {lastname}".strip()
 
+def fetch_player(player):
+    """A trending player with their news, or None when they cannot be searched"""
+    player_info = player.get('player', {})
+    player_name = get_preferred_name(player_info)
+    topic_title = player.get('topic_title')
+    
+    if not topic_title:
+        print(f"WARNING: Skipping {player_name} - missing topic title")
+        return None
+    
+    return {
+        "player": player,
+        "player_name": player_name,
+        "topic_title": topic_title,
+        "articles": fetch_news_for_player(player_name, topic_title),
+    }
+
+def build_player_news(entry, trend_summary):
+    """Output record of a fetched player and their summary"""
+    player = entry["player"]
+    player_news = {
+        "player_id": player.get('player', {}).get('id'),
+        "player_name": entry["player_name"],
+        "trending_score": player.get('trending_score'),
+        "trend_summary": trend_summary,
+        "news": []
+    }
+    
+    for article in entry["articles"]:
+        news_item = {
+            "title": clean_title(article.get('title', '')),
+            "description": clean_description(article.get('description', '')),
+            "date": article.get('published date'),
+        }
+        player_news["news"].append(news_item)
+    
+    print(f"Completed processing for {entry['player_name']}")
+    return player_news
+
+def fetch_and_summarize(player):
+    """News and its own summary for one player, or None when they cannot be searched"""
+    entry = fetch_player(player)
+    if entry is None:
+        return None
+    return build_player_news(entry, generate_trend_summary(
+        entry["articles"], entry["player_name"], entry["topic_title"]))
+
 def main():
     print("\nStarting news update process...")
     try:
@@ -160,7 +369,7 @@ def main():
         print("ERROR: trending_footballers.json not found")
         return
     
-    players = data.get('players', [])[:5]
+    players = data.get('players', [])[:TOP_PLAYERS]
     print(f"Processing top {len(players)} players")
     
     news_data = {
@@ -168,39 +377,22 @@ def main():
         "player_news": []
     }
     
-    for idx, player in enumerate(players, 1):
-        print(f"\nProcessing player {idx} of {len(players)}...")
-        player_info = player.get('player', {})
-        player_name = get_preferred_name(player_info)
-        topic_title = player.get('topic_title')
-        
-        if not topic_title:
-            print(f"WARNING: Skipping {player_name} - missing topic title")
-            continue
-        
-        news_articles = fetch_news_for_player(player_name, topic_title)
-        trend_summary = generate_trend_summary(news_articles, player_name, topic_title)
-        
-        print(f"Adding news data for {player_name}")
-        player_news = {
-            "player_id": player_info.get('id'),
-            "player_name": player_name,
-            "trending_score": player.get('trending_score'),
-            "trend_summary": trend_summary,
-            "news": []
-        }
-        
-        for article in news_articles:
-            news_item = {
-                "title": clean_title(article.get('title', '')),
-                "description": clean_description(article.get('description', '')),
-                "date": article.get('published date'),
-            }
-            player_news["news"].append(news_item)
-        
-        news_data["player_news"].append(player_news)
-        print(f"Completed processing for {player_name}")
-        time.sleep(2)
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max(len(players), 1)) as executor:
+        if SUMMARY_MODE == 'batch':
+            # Every player's news at once, then one request for all summaries
+            entries = [entry for entry in executor.map(fetch_player, players) if entry is not None]
+            summaries = batch_trend_summaries(entries, executor)
+            news_data["player_news"] = [build_player_news(entry, summary)
+                                        for entry, summary in zip(entries, summaries)]
+        else:
+            # Every player at once: one player's summary overlaps the others' searches
+            for player_news in executor.map(fetch_and_summarize, players):
+                if player_news is not None:
+                    news_data["player_news"].append(player_news)
+    print(f"\nFetched news for {len(news_data['player_news'])} players in {time.time() - start_time:.2f} seconds")
+    cache_hits, cache_misses = summary_cache.stats()
+    print(f"Summary cache: {cache_hits} reused, {cache_misses} missed")
     
     output_path = 'public/player_news.json'
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -1,14 +1,127 @@
 import requests
+import threading
 import time
 import json
 import urllib3
 import os
-from typing import Dict, List, Optional, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from player_store import PlayerStore
+from roster_pages import RosterPages, content_hash
 
 urllib3.disable_warnings()
 
 BASE_URL = "https://v3.football.api-sports.io/"
 OUTPUT_FILE = "public/players.json"
+OUTPUT_DATASET = "players"  # Player store dataset mirroring OUTPUT_FILE
+STAGING_DATASET = "players_staging"  # The roster being assembled, until it replaces OUTPUT_DATASET
+CHANGES_FILE = "public/players_changes.json"  # Player IDs that changed in the last saved roster
+QUOTA_RESERVE = int(os.environ.get('FOOTBALL_API_QUOTA_RESERVE', 10))  # Daily requests left untouched
+FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', 8))  # Concurrent page requests
+RATE_LIMIT_PER_MINUTE = int(os.environ.get('FOOTBALL_API_RATE_LIMIT', 10))  # Until the API reports its own
+RATE_LIMIT_WINDOW = 60  # API-Football limits requests per rolling minute
+MAX_RATE_LIMIT_RETRIES = 3
+
+# In priority order: when the quota runs short, later leagues reuse stored pages
+LEAGUES = {
+    'Premier League': 39,
+    'La Liga': 140,
+    'Bundesliga': 78,
+    'Serie A': 135,
+    'Ligue 1': 61
+}
+
+class RateLimiter:
+    """Allow at most limit calls in any rolling window, shared by all threads.
+
+    A call holds its slot from the moment it starts and is dated by when it
+    completed, since the API counts it on arrival; dating it by its start would
+    let a burst after the window rolls over reach the API early.
+    """
+    def __init__(self, limit: int, window: float = RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._completed = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def _expire(self, now: float):
+        while self._completed and now - self._completed[0] >= self.window:
+            self._completed.popleft()
+
+    @contextmanager
+    def slot(self):
+        """Block until a call fits in the window, and hold its place while it runs"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if len(self._completed) + self._in_flight < self.limit:
+                    break
+                delay = self.window - (now - self._completed[0]) if self._completed else None
+                self._condition.wait(delay)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._completed.append(time.monotonic())
+                self._condition.notify()
+
+    def update(self, headers: Dict[str, str]):
+        """Follow the per-minute limit and remaining calls the API reports"""
+        with self._condition:
+            if headers.get('X-RateLimit-Limit', '').isdigit():
+                self.limit = max(int(headers['X-RateLimit-Limit']), 1)
+            if headers.get('X-RateLimit-Remaining', '').isdigit():
+                # Calls made elsewhere this minute count against us too
+                used = self.limit - int(headers['X-RateLimit-Remaining'])
+                now = time.monotonic()
+                while len(self._completed) < used:
+                    self._completed.append(now)
+            self._condition.notify_all()
+
+    def pause(self):
+        """Treat the current window as used up, after the API refused a call"""
+        with self._condition:
+            now = time.monotonic()
+            self._completed.extend([now] * max(self.limit - len(self._completed), 0))
+
+class RequestBudget:
+    """Requests this run may still spend out of the daily quota"""
+    def __init__(self, requests: int):
+        self.remaining = max(requests, 0)
+        self._lock = threading.Lock()
+
+    def take(self, count: int) -> bool:
+        """Reserve exactly count requests if that many are left"""
+        with self._lock:
+            if self.remaining < count:
+                return False
+            self.remaining -= count
+            return True
+
+    def take_up_to(self, count: int) -> int:
+        """Reserve up to count requests and return how many were granted"""
+        with self._lock:
+            granted = min(count, self.remaining)
+            self.remaining -= granted
+            return granted
+
+# Shared connection pool and rate limit for every request
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=2 * FETCH_WORKERS))  # Page workers plus league threads
+rate_limiter = RateLimiter(RATE_LIMIT_PER_MINUTE)
+page_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+
+# Last seen pages and the saved roster they were assembled into
+roster_pages = RosterPages()
+player_store = PlayerStore()
 
 def get_api_headers() -> Dict[str, str]:
     return {
@@ -19,51 +132,50 @@ def get_api_headers() -> Dict[str, str]:
 def call_api(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
     params = params or {}
     
-    try:
-        response = requests.get(
-            f"{BASE_URL}{endpoint}",
-            headers=get_api_headers(),
-            params=params,
-            verify=False
-        )
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            with rate_limiter.slot():
+                response = session.get(
+                    f"{BASE_URL}{endpoint}",
+                    headers=get_api_headers(),
+                    params=params,
+                    verify=False
+                )
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed: {str(e)}")
+            return None
+        rate_limiter.update(response.headers)
         
         if response.status_code == 200:
             data = response.json()
             if "errors" in data and data["errors"]:
+                # Over the per-minute limit the API answers 200 with a rateLimit error
+                if isinstance(data["errors"], dict) and "rateLimit" in data["errors"] \
+                        and attempt < MAX_RATE_LIMIT_RETRIES:
+                    print(f"Rate limited on {endpoint} {params}, waiting for the next window")
+                    rate_limiter.pause()
+                    continue
                 print(f"API Error: {data['errors']}")
                 return None
             return data
+        elif response.status_code == 429 and attempt < MAX_RATE_LIMIT_RETRIES:
+            print(f"Rate limited on {endpoint} {params}, waiting for the next window")
+            rate_limiter.pause()
+            continue
         else:
             print(f"Error: {response.status_code} - {response.text}")
             return None
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {str(e)}")
-        return None
+    return None
 
-def fetch_players(league_id: int, season: int, page: int = 1, 
-                  accumulated_players: Optional[List] = None) -> List:
-    accumulated_players = accumulated_players or []
-    
-    print(f"Fetching players data - Page {page}")
+def fetch_page(league_id: int, season: int, page: int) -> Optional[Dict]:
     response = call_api("players", {"league": league_id, "season": season, "page": page})
     
     if not response or "response" not in response:
-        print("Failed to get response from API")
-        return accumulated_players
-    
-    current_page_players = response["response"]
-    if not current_page_players:
-        print("No more players found")
-        return accumulated_players
-        
-    accumulated_players.extend(current_page_players)
-    print(f"Found {len(current_page_players)} players on page {page}")
-    
-    if response["paging"]["current"] < response["paging"]["total"]:
-        time.sleep(0.25)  # Rate limiting
-        return fetch_players(league_id, season, page + 1, accumulated_players)
+        print(f"Failed to get response from API for league {league_id} page {page}")
+        return None
     
-    return accumulated_players
+    print(f"Found {len(response['response'])} players on league {league_id} page {page}")
+    return response
 
 def get_current_season(league_id: int) -> int:
     response = call_api("leagues", {"id": league_id})
@@ -78,7 +190,8 @@ def get_current_season(league_id: int) -> int:
     
     raise Exception("No current season found for league")
 
-def verify_api_connection():
+def verify_api_connection() -> int:
+    """Check the API key and return the requests left today"""
     status = call_api("status")
     if not status:
         print("Failed to connect to API. Please check your API key.")
@@ -92,47 +205,235 @@ def verify_api_connection():
     print(f"Account: {account['firstname']} {account['lastname']}")
     print(f"Plan: {subscription['plan']}")
     print(f"Requests today: {requests['current']}/{requests['limit_day']}")
+    print(f"Rate limit: {rate_limiter.limit} requests per minute")
+    return requests['limit_day'] - requests['current']
 
-def save_players_data(players: List[Dict]) -> None:
-    os.makedirs('public', exist_ok=True)
-    
-    with open(OUTPUT_FILE, "w") as file:
-        json.dump(players, file, indent=4)
-    
-    print(f"\nTotal players saved to '{OUTPUT_FILE}': {len(players)} players")
-
-def main():
-    verify_api_connection()
-
-    leagues = {
-        'Premier League': 39,
-        'La Liga': 140,
-        'Bundesliga': 78,
-        'Serie A': 135,
-        'Ligue 1': 61
-    }
-    
-    all_players = []
-    
-    for league_name, league_id in leagues.items():
+def fetch_league_head(league_name: str, league_id: int, granted: bool) -> Optional[Tuple[int, int]]:
+    """Season and page count of a league, from page 1 when the quota allows it or
+    from the stored pages otherwise"""
+    if granted:
         try:
             season = get_current_season(league_id)
             print(f"\nFetching players for {league_name} season {season}")
-            
-            league_players = fetch_players(league_id, season)
-            if league_players:
-                print(f"Found {len(league_players)} players in {league_name}")
-                all_players.extend(league_players)
-            else:
-                print(f"Failed to fetch players for {league_name}")
-                
+            first_page = fetch_page(league_id, season, 1)
+            if first_page:
+                total = first_page["paging"]["total"]
+                roster_pages.put(league_id, season, 1, total, first_page["response"])
+                return season, total
         except Exception as e:
             print(f"Error processing {league_name}: {str(e)}")
     
-    if all_players:
-        save_players_data(all_players)
-    else:
+    season = roster_pages.latest_season(league_id)
+    first_page = roster_pages.entries(league_id, season).get(1) if season else None
+    if first_page is None:
+        return None
+    print(f"Reusing stored pages for {league_name} season {season}")
+    return season, first_page.total
+
+def plan_pages(heads: Dict[int, Tuple[int, int]], budget: RequestBudget) -> List[Tuple[int, int, int]]:
+    """Pages beyond the first to fetch, most in need of a refresh first, cut to the budget.
+
+    Pages never fetched come first, then pages that changed when last fetched,
+    then the least recently fetched; leagues break ties in priority order.
+    """
+    candidates = []
+    for priority, (league_id, (season, total)) in enumerate(heads.items()):
+        entries = roster_pages.entries(league_id, season)
+        for page in range(2, total + 1):
+            entry = entries.get(page)
+            if entry is None:
+                key = (0, 0.0, priority, page)
+            else:
+                key = (1 if entry.changed_last_time else 2, entry.fetched_at, priority, page)
+            candidates.append((key, (league_id, season, page)))
+    candidates.sort()
+    granted = budget.take_up_to(len(candidates))
+    print(f"\nRequest plan: {granted} of {len(candidates)} further pages, "
+          f"{len(candidates) - granted} reused from earlier runs")
+    return [request for _, request in candidates[:granted]]
+
+def fetch_planned_pages(planned: List[Tuple[int, int, int]]) -> int:
+    """Fetch planned pages concurrently into the page store; returns how many changed"""
+    def fetch(request: Tuple[int, int, int]) -> bool:
+        league_id, season, page = request
+        response = fetch_page(league_id, season, page)
+        if response is None:
+            return False
+        return roster_pages.put(league_id, season, page, response["paging"]["total"], response["response"])
+    
+    return sum(page_executor.map(fetch, planned))
+
+def missing_page(league_id: int, season: int, total: int) -> Optional[int]:
+    """First page of a league never stored, or None when its roster can be assembled"""
+    entries = roster_pages.entries(league_id, season)
+    return next((page for page in range(1, total + 1) if page not in entries), None)
+
+def iter_league(league_id: int, season: int, total: int) -> Iterator[Dict]:
+    """A league's players from its stored pages, one page in memory at a time"""
+    for page in range(1, total + 1):
+        yield from roster_pages.players(league_id, season, page) or []
+
+def iter_roster(heads: Dict[int, Tuple[int, int]]) -> Iterator[Dict]:
+    """Every league's players in priority order, from the stored pages when complete
+    and from the last saved roster otherwise"""
+    for league_name, league_id in LEAGUES.items():
+        count = 0
+        head = heads.get(league_id)
+        page = missing_page(league_id, *head) if head else None
+        if head and page is None:
+            for player in iter_league(league_id, *head):
+                count += 1
+                yield player
+            if count:
+                print(f"Found {count} players in {league_name}")
+                continue
+        elif head:
+            print(f"Missing page {page}/{head[1]} for league {league_id}")
+        
+        # An incomplete league would read as mass removals, keep the last roster instead
+        for player in player_store.iter_records(OUTPUT_DATASET, league_id=league_id):
+            count += 1
+            yield player
+        print(f"Failed to fetch players for {league_name}, keeping {count} from the last roster")
+
+def merge_listings(listings: List[Dict]) -> Dict:
+    """One record for a player listed by several leagues, with their statistics combined.
+
+    Preprocessing matches on the team of statistics[0], so the current team goes
+    first: a team the player was not listed with in the last saved roster (they
+    just moved there), else the last roster's current team, else the team with the
+    most appearances. League priority order breaks the remaining ties.
+    """
+    statistics = []
+    seen = set()
+    for listing in listings:
+        for entry in listing.get('statistics') or []:
+            key = (entry['team']['id'], entry['league']['id'])
+            if key not in seen:
+                seen.add(key)
+                statistics.append(entry)
+    
+    previous = player_store.by_player_id(OUTPUT_DATASET, listings[0]['player']['id'])
+    previous_teams = {entry['team']['id'] for record in previous for entry in record.get('statistics') or []}
+    previous_team = previous[0]['statistics'][0]['team']['id'] if previous else None
+    
+    def current_first(entry: Dict) -> Tuple[bool, bool, int]:
+        team_id = entry['team']['id']
+        appearances = (entry.get('games') or {}).get('appearences') or 0
+        return bool(previous) and team_id in previous_teams, team_id != previous_team, -appearances
+    
+    return {**listings[0], 'statistics': sorted(statistics, key=current_first)}
+
+def merge_transfers(dataset: str) -> Dict[int, Dict]:
+    """Merged records of the players a dataset lists more than once, by player ID"""
+    return {player_id: merge_listings(player_store.by_player_id(dataset, player_id))
+            for player_id in player_store.duplicate_ids(dataset)}
+
+def iter_merged(players: Iterable[Dict], merged: Dict[int, Dict]) -> Iterator[Dict]:
+    """Players with each merged record in place of its first listing and the others dropped"""
+    emitted = set()
+    for player in players:
+        player_id = player['player']['id']
+        if player_id not in merged:
+            yield player
+        elif player_id not in emitted:
+            emitted.add(player_id)
+            yield merged[player_id]
+
+def player_index(players: Iterable[Dict]) -> Iterator[Tuple[int, str, frozenset]]:
+    """(player ID, content hash, team IDs) of players ordered by ID, one per ID"""
+    current = None
+    for player in players:
+        player_id = player['player']['id']
+        teams = frozenset(entry['team']['id'] for entry in player.get('statistics') or [])
+        if current and current[0] == player_id:
+            # Listed twice in a roster saved before listings were merged
+            current = (player_id, content_hash([current[1], content_hash(player)]), current[2] | teams)
+            continue
+        if current:
+            yield current
+        current = (player_id, content_hash(player), teams)
+    if current:
+        yield current
+
+def build_changeset(previous: Iterator[Tuple[int, str, frozenset]],
+                    current: Iterator[Tuple[int, str, frozenset]]) -> Dict[str, List[int]]:
+    """Player IDs that are new, removed, transferred (team changed) or changed at all,
+    merged from two indexes ordered by ID"""
+    changes: Dict[str, List[int]] = {'new': [], 'removed': [], 'transferred': [], 'changed': []}
+    old, new = next(previous, None), next(current, None)
+    while old or new:
+        if new is None or (old is not None and old[0] < new[0]):
+            changes['removed'].append(old[0])
+            old = next(previous, None)
+        elif old is None or new[0] < old[0]:
+            changes['new'].append(new[0])
+            new = next(current, None)
+        else:
+            if old[2] != new[2]:
+                changes['transferred'].append(new[0])
+            if old[1] != new[1]:
+                changes['changed'].append(new[0])
+            old, new = next(previous, None), next(current, None)
+    return changes
+
+def save_players_data(players: Iterable[Dict]) -> None:
+    """Write the roster and its changeset, unless no player changed.
+
+    Players stream into a staging dataset first, so the saved roster stays intact
+    for the leagues that fall back to it and for the changeset. A player listed by
+    several leagues after a mid-season move is saved once, at their first listing,
+    so they are resolved and ranked once.
+    """
+    if not player_store.write(STAGING_DATASET, players):
+        player_store.delete(STAGING_DATASET)
         print("\nFailed to fetch any players data.")
+        return
+    
+    merged = merge_transfers(STAGING_DATASET)
+    if merged:
+        print(f"Merged {len(merged)} players listed by several leagues")
+    saved = player_store.count(OUTPUT_DATASET)
+    changes = build_changeset(
+        player_index(player_store.iter_by_player_id(OUTPUT_DATASET)),
+        player_index(iter_merged(player_store.iter_by_player_id(STAGING_DATASET), merged)))
+    if saved and not any(changes.values()):
+        player_store.delete(STAGING_DATASET)
+        print(f"\nNo player changed, keeping '{OUTPUT_FILE}'")
+        return
+    
+    changed_rows = player_store.update(OUTPUT_DATASET,
+                                       iter_merged(player_store.iter_records(STAGING_DATASET), merged))
+    player_store.delete(STAGING_DATASET)
+    count = player_store.count(OUTPUT_DATASET)
+    player_store.export(OUTPUT_DATASET, OUTPUT_FILE, indent=4)
+    
+    tmp_path = CHANGES_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': datetime.now(timezone.utc).isoformat(), **changes}, f, indent=4)
+    os.replace(tmp_path, CHANGES_FILE)
+    
+    print(f"\nTotal players saved to '{OUTPUT_FILE}': {count} players ({changed_rows} rows rewritten)")
+    print(f"Changes: {len(changes['new'])} new, {len(changes['removed'])} removed, "
+          f"{len(changes['transferred'])} transferred, {len(changes['changed'])} updated "
+          f"(see '{CHANGES_FILE}')")
+
+def main():
+    remaining = verify_api_connection()
+    budget = RequestBudget(remaining - QUOTA_RESERVE)
+    if os.path.exists(OUTPUT_FILE):
+        player_store.sync(OUTPUT_DATASET, OUTPUT_FILE)
+    
+    # Season lookup and page 1 of every league the budget covers, in parallel
+    granted = [budget.take(2) for _ in LEAGUES]
+    with ThreadPoolExecutor(max_workers=len(LEAGUES)) as executor:
+        heads = list(executor.map(fetch_league_head, LEAGUES.keys(), LEAGUES.values(), granted))
+    known_heads = {league_id: head for league_id, head in zip(LEAGUES.values(), heads) if head}
+    
+    changed_pages = fetch_planned_pages(plan_pages(known_heads, budget))
+    print(f"Pages changed since their last fetch: {changed_pages}")
+    
+    save_players_data(iter_roster(known_heads))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,144 @@
+"""
+Gemini Simulator
+
+Local stand-in for the Gemini generateContent REST endpoint, so the news
+summaries can be exercised offline. Plain prompts get a one-sentence summary
+built from their first article title. Prompts asking for JSON get an array with
+one {"id", "summary"} entry per "ID:" line of the prompt. Latency, blocked
+prompts and entries dropped from batched answers can be injected to exercise
+the fallback paths.
+
+Start it and point fetch_player_news.py at it with GEMINI_API_ENDPOINT:
+    python src/scripts/gemini_simulator.py --port 8765 --drop-rate 0.2
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GOOGLE_API_KEY=test python src/scripts/fetch_player_news.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+ID_PATTERN = re.compile(r'^ID: (\S+)$', re.MULTILINE)
+TITLE_PATTERN = re.compile(r'^Title: (.+)$', re.MULTILINE)
+
+
+class GeminiSimulator:
+    """Canned generateContent answers with injectable latency and failures"""
+    def __init__(self, latency: float = 0.0, block_rate: float = 0.0, drop_rate: float = 0.0,
+                 seed: int = 42):
+        self.latency = latency
+        self.block_rate = block_rate
+        self.drop_rate = drop_rate
+        self.requests = 0
+        self.blocked = 0
+        self.dropped = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def summarize(self, prompt: str) -> str:
+        titles = TITLE_PATTERN.findall(prompt)
+        headline = titles[0] if titles else 'no headline'
+        return f"Simulated summary: {headline}."
+
+    def batch(self, prompt: str) -> List[Dict[str, str]]:
+        """One entry per ID section, each section summarised on its own"""
+        sections = ID_PATTERN.split(prompt)[1:]
+        entries = []
+        for player_id, section in zip(sections[::2], sections[1::2]):
+            with self._lock:
+                if self._random.random() < self.drop_rate:
+                    self.dropped += 1
+                    continue
+            entries.append({'id': player_id, 'summary': self.summarize(section)})
+        return entries
+
+    def generate(self, request: Dict) -> Dict:
+        """generateContent response body for a request body"""
+        with self._lock:
+            self.requests += 1
+            blocked = self._random.random() < self.block_rate
+            self.blocked += blocked
+        if self.latency:
+            time.sleep(self.latency)
+        if blocked:
+            return {'promptFeedback': {'blockReason': 'SAFETY'}}
+
+        prompt = ''.join(part.get('text', '') for content in request.get('contents', [])
+                         for part in content.get('parts', []))
+        config = request.get('generationConfig') or {}
+        if config.get('responseMimeType') == 'application/json':
+            text = json.dumps(self.batch(prompt))
+        else:
+            text = self.summarize(prompt)
+        return {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0,
+            }],
+            'usageMetadata': {'promptTokenCount': len(prompt) // 4,
+                              'candidatesTokenCount': len(text) // 4},
+        }
+
+
+def make_handler(simulator: GeminiSimulator):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.split('?')[0].endswith(':generateContent'):
+                self.send_error(404)
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.dumps(simulator.generate(json.loads(self.rfile.read(length) or b'{}')))
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def serve(simulator: GeminiSimulator, port: int = 0,
+          background: bool = True) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stand-in server; returns it with its endpoint URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(simulator))
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, endpoint
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per request')
+    parser.add_argument('--block-rate', type=float, default=0.0, help='Share of prompts blocked')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Share of batched entries left out of the answer')
+    parser.add_argument('--seed', type=int, default=42, help='Failure injection seed')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    simulator = GeminiSimulator(args.latency, args.block_rate, args.drop_rate, args.seed)
+    server, endpoint = serve(simulator, args.port, background=False)
+    print(f"Gemini simulator listening on {endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Requests: {simulator.requests}, blocked: {simulator.blocked}, "
+          f"dropped entries: {simulator.dropped}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Observation Store
+
+Keeps every interest-over-time series returned during a run in compact NumPy
+arrays instead of discarding all but the peak. Rows are (payload, identifier)
+series, columns a timestamp index shared by all payloads, and values uint8 Trends
+scores. Scoring functions run vectorized over the whole store, and the final
+interest_over_time output is read back from it without another call.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MISSING = 255  # Trends values are 0-100, so this never collides with data
+RECENCY_HALF_LIFE_HOURS = 6  # Weight halves for every 6 hours before the latest point
+SCORING_METHODS = ('peak', 'auc', 'recency')
+
+
+class ObservationStore:
+    """Columnar store of every Trends response seen in a run"""
+    def __init__(self, row_capacity: int = 1024, column_capacity: int = 256):
+        self.values = np.full((row_capacity, column_capacity), MISSING, dtype=np.uint8)
+        self.row_payload = np.zeros(row_capacity, dtype=np.int32)
+        self.row_key = np.zeros(row_capacity, dtype=np.int32)
+        self.timestamps = np.zeros(column_capacity, dtype='datetime64[s]')
+        self.n_rows = 0
+        self.n_columns = 0
+        self.keys: List[str] = []
+        self.payload_rows: List[Tuple[int, int]] = []  # (first row, row count) per payload
+        self._key_index: Dict[str, int] = {}
+        self._column_index: Dict[np.datetime64, int] = {}
+        self._payload_index: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def _grow(self, rows: int, columns: int):
+        row_capacity, column_capacity = self.values.shape
+        if rows <= row_capacity and columns <= column_capacity:
+            return
+        new_rows = row_capacity if rows <= row_capacity else max(rows, 2 * row_capacity)
+        new_columns = column_capacity if columns <= column_capacity else max(columns, 2 * column_capacity)
+        values = np.full((new_rows, new_columns), MISSING, dtype=np.uint8)
+        values[:self.n_rows, :self.n_columns] = self.values[:self.n_rows, :self.n_columns]
+        self.values = values
+        if new_rows > row_capacity:
+            self.row_payload = np.resize(self.row_payload, new_rows)
+            self.row_key = np.resize(self.row_key, new_rows)
+        if new_columns > column_capacity:
+            self.timestamps = np.resize(self.timestamps, new_columns)
+
+    def _key_id(self, identifier: str) -> int:
+        if identifier not in self._key_index:
+            self._key_index[identifier] = len(self.keys)
+            self.keys.append(identifier)
+        return self._key_index[identifier]
+
+    def find_payload(self, identifiers: List[str]) -> Optional[int]:
+        """Payload id of an earlier response for the same set of identifiers"""
+        return self._payload_index.get(tuple(sorted(identifiers)))
+
+    def add(self, interest_data: pd.DataFrame, identifiers: List[str]) -> int:
+        """Store one response and return its payload id; repeats are stored once"""
+        payload_key = tuple(sorted(identifiers))
+        with self._lock:
+            if payload_key in self._payload_index:
+                return self._payload_index[payload_key]
+
+            stamps = interest_data.index.values.astype('datetime64[s]')
+            new_stamps = [ts for ts in dict.fromkeys(stamps) if ts not in self._column_index]
+            self._grow(self.n_rows + len(identifiers), self.n_columns + len(new_stamps))
+            for ts in new_stamps:
+                self._column_index[ts] = self.n_columns
+                self.timestamps[self.n_columns] = ts
+                self.n_columns += 1
+
+            columns = np.array([self._column_index[ts] for ts in stamps], dtype=np.intp)
+            payload_id = len(self.payload_rows)
+            first = self.n_rows
+            for offset, identifier in enumerate(identifiers):
+                row = first + offset
+                series = interest_data[identifier].to_numpy(dtype=np.float64, na_value=0.0)
+                self.values[row, columns] = np.clip(np.rint(series), 0, 100).astype(np.uint8)
+                self.row_payload[row] = payload_id
+                self.row_key[row] = self._key_id(identifier)
+
+            self.n_rows += len(identifiers)
+            self.payload_rows.append((first, len(identifiers)))
+            self._payload_index[payload_key] = payload_id
+            return payload_id
+
+    def scores(self, method: str = 'peak') -> np.ndarray:
+        """Score every stored row at once; see score_rows for the methods"""
+        with self._lock:
+            values = self.values[:self.n_rows, :self.n_columns]
+            stamps = self.timestamps[:self.n_columns]
+            return score_rows(values, stamps, method)
+
+    def payload_scores(self, payload_id: int, method: str = 'peak') -> Dict[str, float]:
+        """Scores of one payload's identifiers"""
+        first, count = self.payload_rows[payload_id]
+        with self._lock:
+            values = self.values[first:first + count, :self.n_columns]
+            stamps = self.timestamps[:self.n_columns]
+            keys = self.row_key[first:first + count]
+            scores = score_rows(values, stamps, method)
+        return {self.keys[key]: float(score) for key, score in zip(keys, scores)}
+
+    def ratio_bounds(self, reference: str, method: str = 'peak', slack: float = 1.0,
+                     max_iterations: int = 50) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Lower and upper bounds on log(score / score of reference) for every identifier.
+
+        Two series in one payload bound the ratio of their scores up to rounding;
+        chaining pairs across payloads bounds identifiers that never shared a
+        payload with the reference. slack widens every pairwise bound to absorb
+        sampling noise. Identifiers without a path to the reference get -inf/inf.
+        """
+        with self._lock:
+            if reference not in self._key_index or not self.payload_rows:
+                return {}, {}
+            values = self.values[:self.n_rows, :self.n_columns]
+            scores = score_rows(values, self.timestamps[:self.n_columns], method)
+            if method == 'auc':
+                half_width = 0.5 * (values != MISSING).sum(axis=1)
+            else:
+                half_width = np.full(self.n_rows, 0.5)
+            firsts = np.array([first for first, _ in self.payload_rows])
+            counts = np.array([count for _, count in self.payload_rows])
+            row_key = self.row_key[:self.n_rows].copy()
+            keys = list(self.keys)
+            ref = self._key_index[reference]
+
+        src, dst = payload_pairs(firsts, counts)
+        log_slack = np.log(slack)
+        up_valid = scores[dst] - half_width[dst] > 0
+        up_src, up_dst = row_key[src[up_valid]], row_key[dst[up_valid]]
+        up_step = np.log((scores[src[up_valid]] + half_width[src[up_valid]])
+                         / (scores[dst[up_valid]] - half_width[dst[up_valid]])) + log_slack
+        low_valid = scores[src] - half_width[src] > 0
+        low_src, low_dst = row_key[src[low_valid]], row_key[dst[low_valid]]
+        low_step = np.log((scores[src[low_valid]] - half_width[src[low_valid]])
+                          / (scores[dst[low_valid]] + half_width[dst[low_valid]])) - log_slack
+
+        upper = np.full(len(keys), np.inf)
+        lower = np.full(len(keys), -np.inf)
+        upper[ref] = lower[ref] = 0.0
+        for _ in range(max_iterations):
+            new_upper = upper.copy()
+            np.minimum.at(new_upper, up_src, upper[up_dst] + up_step)
+            new_lower = lower.copy()
+            np.maximum.at(new_lower, low_src, lower[low_dst] + low_step)
+            new_upper[ref] = new_lower[ref] = 0.0
+            if np.array_equal(new_upper, upper) and np.array_equal(new_lower, lower):
+                break
+            upper, lower = new_upper, new_lower
+
+        return dict(zip(keys, lower.tolist())), dict(zip(keys, upper.tolist()))
+
+    def series(self, payload_id: int) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Timestamps and values of every identifier in a payload, in time order"""
+        first, count = self.payload_rows[payload_id]
+        result = {}
+        with self._lock:
+            for row in range(first, first + count):
+                present = self.values[row, :self.n_columns] != MISSING
+                stamps = self.timestamps[:self.n_columns][present]
+                values = self.values[row, :self.n_columns][present]
+                order = np.argsort(stamps)
+                result[self.keys[self.row_key[row]]] = (stamps[order], values[order])
+        return result
+
+
+def payload_pairs(firsts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every ordered pair of rows that share a payload, as (source rows, destination rows)"""
+    src_parts, dst_parts = [np.zeros(0, dtype=np.intp)], [np.zeros(0, dtype=np.intp)]
+    longest = int(counts.max(initial=0))
+    for a in range(longest):
+        for b in range(longest):
+            mask = (a < counts) & (b < counts)
+            if a != b and mask.any():
+                src_parts.append(firsts[mask] + a)
+                dst_parts.append(firsts[mask] + b)
+    return np.concatenate(src_parts), np.concatenate(dst_parts)
+
+
+def score_rows(values: np.ndarray, stamps: np.ndarray, method: str) -> np.ndarray:
+    """Score rows of a value matrix.
+
+    peak is the highest point, auc the sum over the window and recency the highest
+    point after exponential decay away from the row's latest timestamp. Scores are
+    comparable between rows of the same payload.
+    """
+    present = values != MISSING
+    data = np.where(present, values, 0).astype(np.float64)
+
+    if method == 'peak':
+        return data.max(axis=1, initial=0.0)
+    if method == 'auc':
+        return data.sum(axis=1)
+    if method == 'recency':
+        seconds = stamps.astype(np.int64)[None, :]
+        latest = np.where(present, seconds, np.iinfo(np.int64).min).max(axis=1, keepdims=True)
+        age_hours = np.clip(latest - seconds, 0, None) / 3600
+        weights = np.power(0.5, age_hours / RECENCY_HALF_LIFE_HOURS)
+        return (data * weights).max(axis=1, initial=0.0)
+    raise ValueError(f"Unknown scoring method: {method}")
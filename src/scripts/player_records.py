@@ -0,0 +1,73 @@
+"""
+Player Records
+
+Compact view of the preprocessed players for the ranking hot path. Each player
+becomes a PlayerRecord holding only what the ranking reads (identifier, IDs, name
+and team) plus its row positions in the player store. The full record, with its
+statistics, is decoded only for players that are written out, so memory stays
+flat as the roster grows.
+"""
+
+from typing import Dict, List, Tuple
+
+from player_store import PlayerStore
+
+
+class PlayerRecord:
+    """One competitor; several store rows when they resolved to one topic"""
+    __slots__ = ('identifier', 'player_id', 'name', 'topic_id', 'team', 'aliases', 'positions')
+
+    def __init__(self, identifier: str, player_id: int, name: str, topic_id: str, team: str,
+                 position: int):
+        self.identifier = identifier
+        self.player_id = player_id
+        self.name = name
+        self.topic_id = topic_id
+        self.team = team
+        self.aliases: Tuple[str, ...] = ()
+        self.positions: Tuple[int, ...] = (position,)
+
+    def __repr__(self) -> str:
+        return f"PlayerRecord({self.identifier!r}, {self.name!r})"
+
+
+def load_records(store: PlayerStore, dataset: str) -> List[PlayerRecord]:
+    """Project a store dataset onto one record per Trends identifier.
+
+    Records that resolved to the same topic (a mid-season transfer listed by two
+    leagues, or two API players matching one topic) would spend two payload slots
+    on one keyword. They merge into the first record, which lists the differing
+    names under aliases.
+    """
+    records: Dict[str, PlayerRecord] = {}
+    for position, identifier, player_id, name, topic_id, team in store.columns(
+            dataset, 'identifier', 'player_id', 'name', 'topic_id', 'team'):
+        record = records.get(identifier)
+        if record is None:
+            records[identifier] = PlayerRecord(identifier, player_id, name, topic_id, team, position)
+            continue
+
+        record.positions += (position,)
+        if name != record.name and name not in record.aliases:
+            record.aliases += (name,)
+
+    return list(records.values())
+
+
+def hydrate(store: PlayerStore, dataset: str, records: List[PlayerRecord]) -> Dict[str, Dict]:
+    """Full player dicts for a few records, keyed by identifier.
+
+    Merged records come back as the first store row with the statistics of all of
+    them and an aliases list.
+    """
+    rows = store.records(dataset, [position for record in records for position in record.positions])
+    players = {}
+    for record in records:
+        parts = [rows[position] for position in record.positions]
+        player = parts[0]
+        for part in parts[1:]:
+            player['statistics'] = player['statistics'] + part['statistics']
+        if record.aliases:
+            player['aliases'] = list(record.aliases)
+        players[record.identifier] = player
+    return players
@@ -0,0 +1,331 @@
+"""
+Player Store
+
+SQLite index over the player files shared by all scripts. Each file is a dataset
+('players' from fetch_players.py, 'preprocessed' from preprocess_players.py) of
+rows in file order: the lookup columns the scripts filter on, plus the full
+record as compact JSON that is decoded only when asked for. Positions only order
+the rows and are spaced apart, so a player inserted by update() takes a free
+position between its neighbours instead of shifting every later row. The JSON files in
+public/ stay the interchange format between workflows; a dataset is re-imported
+only when its file changes, reading it in chunks, and exports stream row by row
+in the same layout json.dump would write.
+"""
+
+import json
+import os
+import sqlite3
+import textwrap
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from run_journal import file_signature
+
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json gives the same output, slower
+    def dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    loads = json.loads
+
+STORE_FILE = os.environ.get('PLAYER_STORE_FILE', 'data/players.sqlite')
+COLUMNS = ('player_id', 'identifier', 'topic_id', 'name', 'team', 'league_id')
+POSITION_STEP = 1 << 32  # Gap between the positions of neighbouring rows when written
+_WHITESPACE = ' \t\n\r'
+
+
+def player_identifier(player: Dict) -> str:
+    """Trends identifier of a raw player record (topic ID, or name when unresolved)"""
+    topic_id = player.get('topic_id') or ''
+    if topic_id.startswith('/m/') or topic_id.startswith('/g/'):
+        return topic_id
+    return player['player']['name']
+
+
+def iter_json_array(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Decode the elements of a top-level JSON array from a file one at a time,
+    reading it in chunks so the file is never held whole"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size)
+    index = buffer.index('[') + 1
+    while True:
+        while index < len(buffer) and buffer[index] in _WHITESPACE + ',':
+            index += 1
+        if index < len(buffer) and buffer[index] == ']':
+            return
+        try:
+            if index == len(buffer):
+                raise ValueError("Need more data")
+            item, index = decoder.raw_decode(buffer, index)
+        except ValueError:
+            # The element runs past the buffer; drop what was consumed and read on
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[index:] + chunk
+            index = 0
+            continue
+        yield item
+
+
+def _row(dataset: str, position: int, player: Dict) -> Tuple:
+    statistics = player.get('statistics') or [{}]
+    return (
+        dataset, position, player['player']['id'], player_identifier(player),
+        player.get('topic_id'), player['player']['name'],
+        statistics[0].get('team', {}).get('name'), statistics[0].get('league', {}).get('id'),
+        dumps(player),
+    )
+
+
+class PlayerStore:
+    """Indexed player datasets with keyed lookup and selective column reads"""
+    def __init__(self, path: str = STORE_FILE):
+        self.path = path
+        # Reentrant: write() and update() may consume a generator reading another dataset
+        self._lock = threading.RLock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS datasets (name TEXT PRIMARY KEY, signature TEXT)")
+            if any(index[1] == 'sqlite_autoindex_players_1'
+                   for index in self._conn.execute("PRAGMA index_list(players)")):
+                # Stores from before positions were spaced; the files are imported again
+                self._conn.executescript("DROP TABLE players; DELETE FROM datasets;")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS players ("
+                "dataset TEXT NOT NULL, position INTEGER NOT NULL, player_id INTEGER, "
+                "identifier TEXT, topic_id TEXT, name TEXT, team TEXT, league_id INTEGER, "
+                "record TEXT NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS players_by_position ON players (dataset, position);"
+                "CREATE INDEX IF NOT EXISTS players_by_id ON players (dataset, player_id);"
+                "CREATE INDEX IF NOT EXISTS players_by_topic ON players (dataset, topic_id);"
+            )
+        return self._conn
+
+    def write(self, dataset: str, players: Iterable[Dict], signature: Optional[str] = None) -> int:
+        """Replace a dataset with players in order; returns the row count"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM players WHERE dataset = ?", (dataset,))
+                count = 0
+                for index, player in enumerate(players):
+                    conn.execute("INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 _row(dataset, index * POSITION_STEP, player))
+                    count += 1
+                conn.execute("INSERT OR REPLACE INTO datasets (name, signature) VALUES (?, ?)",
+                             (dataset, signature))
+            return count
+
+    def update(self, dataset: str, players: Iterable[Dict]) -> int:
+        """Make a dataset hold players in order, writing only rows that differ.
+
+        Stored rows are matched to players by API-Football ID, so a player inserted
+        or removed leaves the rows around it untouched. A matched row keeps its
+        position while the order allows; otherwise it moves to a free position
+        after the previous player. Returns the number of rows inserted, replaced,
+        moved or removed.
+        """
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS kept (id INTEGER PRIMARY KEY)")
+                conn.execute("DELETE FROM kept")
+                changed = 0
+                last = -1  # Position of the previous player; every kept row is at or before it
+                for player in players:
+                    row = _row(dataset, 0, player)
+                    # The first unkept row of this player, preferring one that can stay put
+                    stored = conn.execute(
+                        "SELECT rowid, position, record FROM players WHERE dataset = ? AND player_id = ? "
+                        "AND rowid NOT IN (SELECT id FROM kept) ORDER BY position <= ?, position LIMIT 1",
+                        (dataset, row[2], last)).fetchone()
+
+                    if stored is not None and stored[1] > last:
+                        rowid, position = stored[0], stored[1]
+                        if stored[2] != row[-1]:
+                            conn.execute("UPDATE players SET player_id = ?, identifier = ?, topic_id = ?, "
+                                         "name = ?, team = ?, league_id = ?, record = ? WHERE rowid = ?",
+                                         row[2:] + (rowid,))
+                            changed += 1
+                    else:
+                        position = self._free_position(conn, dataset, last)
+                        if stored is None:
+                            rowid = conn.execute("INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                                 (dataset, position) + row[2:]).lastrowid
+                        else:
+                            rowid = stored[0]
+                            conn.execute("UPDATE players SET position = ?, player_id = ?, identifier = ?, "
+                                         "topic_id = ?, name = ?, team = ?, league_id = ?, record = ? "
+                                         "WHERE rowid = ?", (position,) + row[2:] + (rowid,))
+                        changed += 1
+                    conn.execute("INSERT INTO kept VALUES (?)", (rowid,))
+                    last = position
+
+                changed += conn.execute("DELETE FROM players WHERE dataset = ? AND rowid NOT IN "
+                                        "(SELECT id FROM kept)", (dataset,)).rowcount
+                conn.execute("DELETE FROM kept")
+                conn.execute("INSERT OR IGNORE INTO datasets (name, signature) VALUES (?, NULL)", (dataset,))
+            return changed
+
+    def _free_position(self, conn: sqlite3.Connection, dataset: str, last: int) -> int:
+        """An unused position right after last, making room when the gap is used up"""
+        following = conn.execute("SELECT MIN(position) FROM players WHERE dataset = ? AND position > ?",
+                                 (dataset, last)).fetchone()[0]
+        if following is None:
+            return last + POSITION_STEP
+        if following - last < 2:
+            # Rare: this gap was halved by many runs; shift the rows after it along
+            conn.execute("UPDATE players SET position = position + ? WHERE dataset = ? AND position > ?",
+                         (POSITION_STEP, dataset, last))
+            following += POSITION_STEP
+        return (last + following) // 2
+
+    def sync(self, dataset: str, json_path: str) -> bool:
+        """Import a JSON file into a dataset unless it is already current.
+
+        Returns True when the file was (re)imported.
+        """
+        signature = file_signature(json_path)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT signature FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        if row and row[0] == signature:
+            return False
+
+        with open(json_path, 'r', encoding='utf-8') as f:
+            self.write(dataset, iter_json_array(f), signature)
+        return True
+
+    def export(self, dataset: str, json_path: str, indent: Optional[int] = None) -> None:
+        """Write a dataset to a JSON array file, atomically and row by row"""
+        tmp_path = json_path + '.tmp'
+        directory = os.path.dirname(json_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('[')
+                written = 0
+                for player in self.iter_records(dataset):
+                    if indent is None:
+                        f.write((', ' if written else '') + json.dumps(player))
+                    else:
+                        text = textwrap.indent(json.dumps(player, indent=indent), ' ' * indent)
+                        f.write((',\n' if written else '\n') + text)
+                    written += 1
+                f.write('\n]' if indent is not None and written else ']')
+            os.replace(tmp_path, json_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("UPDATE datasets SET signature = ? WHERE name = ?",
+                             (file_signature(json_path), dataset))
+
+    def count(self, dataset: str) -> int:
+        with self._lock:
+            return self._connect().execute(
+                "SELECT COUNT(*) FROM players WHERE dataset = ?", (dataset,)).fetchone()[0]
+
+    def columns(self, dataset: str, *names: str) -> List[Tuple]:
+        """(position, *names) for every row in file order, without decoding records"""
+        unknown = [name for name in names if name not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown player store columns: {unknown}")
+        with self._lock:
+            return self._connect().execute(
+                f"SELECT {', '.join(('position',) + names)} FROM players "
+                "WHERE dataset = ? ORDER BY position", (dataset,)).fetchall()
+
+    def records(self, dataset: str, positions: Iterable[int]) -> Dict[int, Dict]:
+        """Full records at the given positions"""
+        positions = list(positions)
+        result = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(positions), 500):
+                chunk = positions[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT position, record FROM players WHERE dataset = ? "
+                    f"AND position IN ({', '.join('?' * len(chunk))})", (dataset, *chunk)).fetchall()
+                result.update((position, loads(record)) for position, record in rows)
+        return result
+
+    def by_player_id(self, dataset: str, player_id: int) -> List[Dict]:
+        """Every record of an API-Football player ID, in file order"""
+        return self._lookup(dataset, 'player_id', player_id)
+
+    def duplicate_ids(self, dataset: str) -> List[int]:
+        """API-Football player IDs with more than one row in a dataset"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT player_id FROM players WHERE dataset = ? "
+                "GROUP BY player_id HAVING COUNT(*) > 1", (dataset,)).fetchall()
+        return [player_id for player_id, in rows]
+
+    def by_topic_id(self, dataset: str, topic_id: str) -> List[Dict]:
+        """Every record resolved to a Trends topic ID, in file order"""
+        return self._lookup(dataset, 'topic_id', topic_id)
+
+    def _lookup(self, dataset: str, column: str, value) -> List[Dict]:
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT record FROM players WHERE dataset = ? AND {column} = ? ORDER BY position",
+                (dataset, value)).fetchall()
+        return [loads(record) for record, in rows]
+
+    def iter_records(self, dataset: str, batch_size: int = 1000,
+                     league_id: Optional[int] = None) -> Iterator[Dict]:
+        """Stream a dataset's full records in file order, optionally of one league only"""
+        league_filter = "" if league_id is None else " AND league_id = ?"
+        league_args = () if league_id is None else (league_id,)
+        position = -1
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT position, record FROM players WHERE dataset = ? AND position > ?"
+                    f"{league_filter} ORDER BY position LIMIT ?",
+                    (dataset, position, *league_args, batch_size)).fetchall()
+            if not rows:
+                return
+            for position, record in rows:
+                yield loads(record)
+
+    def iter_by_player_id(self, dataset: str, batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream a dataset's full records ordered by player ID, then file order"""
+        key = (-1, -1)
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT player_id, position, record FROM players WHERE dataset = ? "
+                    "AND (player_id, position) > (?, ?) ORDER BY player_id, position LIMIT ?",
+                    (dataset, *key, batch_size)).fetchall()
+            if not rows:
+                return
+            for player_id, position, record in rows:
+                yield loads(record)
+            key = rows[-1][:2]
+
+    def delete(self, dataset: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM players WHERE dataset = ?", (dataset,))
+                conn.execute("DELETE FROM datasets WHERE name = ?", (dataset,))
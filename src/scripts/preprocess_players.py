@@ -5,14 +5,27 @@ This script processes football player data to:
 1. Filter active players
 2. Find Google Trends topic IDs for players
 3. Save processed data to JSON
+
+Players are resolved concurrently, one at a time per proxy in PROXY_LIST, and
+reported and saved in input order. Search term templates are tried in order of
+their recorded hit rate for the player's league and name shape. Every finished
+player is appended to a journal, so a restarted run skips them, and the journal
+is compacted into the output file at the end. Players stream from the player
+store through filtering and resolution, so memory stays flat as the roster grows.
 """
 
-import json
 import os
-import time
+import re
+import threading
 import unicodedata
-from typing import Dict, List, Optional, Set, Any
-from pytrends.request import TrendReq
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Any, Tuple
+from player_store import PlayerStore
+from proxy_pool import ProxyPool
+from run_journal import PreprocessJournal, file_signature
+from topic_cache import TopicCache, TopicEntry
+from trends_backend import TrendsBackend, create_client
 import html
 import requests
 import random
@@ -20,11 +33,15 @@ import random
 # Constants
 INPUT_FILE = 'public/players.json'
 OUTPUT_FILE = 'public/preprocessed_players.json'
+INPUT_DATASET = 'players'  # Player store datasets mirroring the two files
+OUTPUT_DATASET = 'preprocessed'
 PROXIES = os.environ['PROXY_LIST'].split(',') if 'PROXY_LIST' in os.environ else []
 random.shuffle(PROXIES)  # Shuffle proxies for better load distribution
 MAX_RETRIES = 3
 RETRY_DELAYS = [2, 5, 10]
-MIN_DELAY_BETWEEN_CALLS = 1  # Minimum seconds between API calls
+MIN_DELAY_BETWEEN_CALLS = 1  # Minimum seconds between API calls on one proxy
+SUGGESTION_CACHE_SIZE = 4096  # Search terms whose suggestions are kept for the run
+TEMPLATE_PRIOR = 0.5  # Assumed hit rate of a template without enough history
 
 # Player type constants
 VALID_PLAYER_TYPES = [
@@ -49,6 +66,8 @@ VALID_PLAYER_TYPES = [
     # Wide forwards
     'left-forward', 'left forward', 'right-forward', 'right forward'
 ]
+PLAYER_TYPE_PATTERN = re.compile('|'.join(re.escape(player_type) for player_type in VALID_PLAYER_TYPES))
+INACTIVE_TYPE_PATTERN = re.compile('former|retired')
 
 # Character normalization map
 CHAR_MAP = {
@@ -76,20 +95,63 @@ NICKNAME_MAP = {
     'ricardo': 'ricky', 'rodrigo': 'rodri', 'javier': 'javi'
 }
 
-# Initialize pytrends client
-pytrends = TrendReq(
-    hl='en-US',
-    timeout=(3.05, 30),
-    retries=MAX_RETRIES,
-    backoff_factor=3.0,
-    proxies=PROXIES
-)
+def create_trends_client(proxy: Optional[str]) -> TrendsBackend:
+    """Create a Trends client bound to a single proxy (or none)"""
+    return create_client(
+        hl='en-US',
+        timeout=(3.05, 30),
+        retries=MAX_RETRIES,
+        backoff_factor=3.0,
+        proxies=[proxy] if proxy else []
+    )
+
+# One client per proxy, each paced on its own
+trends_pool = ProxyPool(PROXIES, create_trends_client, MIN_DELAY_BETWEEN_CALLS)
+
+# Shared indexed copy of the player files
+player_store = PlayerStore()
+
+# Topic resolutions from earlier runs
+topic_cache = TopicCache()
+
+# Players finished by this run, or by an interrupted one on the same input
+preprocess_journal = PreprocessJournal()
 
 # Custom Exceptions
 class RetryableError(Exception):
     """Exception for errors that can be retried"""
     pass
 
+class SuggestionCache:
+    """Per-run LRU cache of suggestions by search term"""
+    def __init__(self, max_size: int = SUGGESTION_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, keyword: str) -> Optional[List[Dict]]:
+        """Cached suggestions for a search term, or None if it was not searched"""
+        with self._lock:
+            if keyword not in self._entries:
+                return None
+            self._entries.move_to_end(keyword)
+            return self._entries[keyword]
+    
+    def put(self, keyword: str, suggestions: List[Dict]) -> None:
+        with self._lock:
+            self._entries[keyword] = suggestions
+            self._entries.move_to_end(keyword)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+# Suggestions seen this run, and the number of suggestion requests actually sent
+suggestion_cache = SuggestionCache()
+api_call_count = 0
+api_call_lock = threading.Lock()
+
+# Template hit rates by (league_id, name shape), loaded once per run
+template_rates: Dict[tuple, Dict[str, float]] = {}
+
 # Name Processing Functions
 def normalize_name(name: str) -> str:
     """Normalize special characters in names and decode HTML entities"""
@@ -103,6 +165,7 @@ def normalize_name(name: str) -> str:
     # Normalize remaining special characters
     return unicodedata.normalize('NFKD', decoded).encode('ASCII', 'ignore').decode('utf-8')
 
+@lru_cache(maxsize=65536)
 def normalize_for_comparison(text: str) -> str:
     """Normalize text for name comparison by handling special cases"""
     text = html.unescape(text)
@@ -188,38 +251,70 @@ def get_player_name_variations(player: Dict) -> Set[str]:
     return name_variations
 
 # Matching Functions
-def is_name_match(player: Dict, suggestion: Dict) -> bool:
-    """Determine if a suggestion matches the player's name"""
-    title = normalize_for_comparison(suggestion['title'])
-    name_variations = get_player_name_variations(player)
-    
-    # Check all variations against the title
-    for variation in name_variations:
-        if variation in title or title in variation:
+class NameMatcher:
+    """A player's name variations, prepared once for matching many suggestion titles.
+
+    A title matches when a variation occurs in it or it occurs in a variation. The
+    variations are normalized on the first title that reaches the matcher and also
+    joined by newlines (normalized titles never contain one), so the second test is
+    a single substring search and a title costs a few C-level scans instead of
+    re-deriving every variation.
+    """
+    __slots__ = ('player', 'variations', 'joined', 'initial', 'surname')
+
+    def __init__(self, player: Dict):
+        self.player = player
+        self.variations = None
+
+    def _prepare(self):
+        self.variations = tuple(get_player_name_variations(self.player))
+        self.joined = '\n'.join(self.variations)
+        
+        # Special handling for names with initials
+        self.initial = self.surname = None
+        display_name = self.player['player']['name']
+        if '.' in display_name:
+            name_parts = display_name.replace('-', ' ').split()
+            self.surname = normalize_for_comparison(' '.join(name_parts[1:]))
+            self.initial = name_parts[0].replace('.', '').strip().lower()
+
+    def matches(self, title: str) -> bool:
+        """Determine if a suggestion title matches the player's name"""
+        if self.variations is None:
+            self._prepare()
+        title = normalize_for_comparison(title)
+        if title in self.joined or any(variation in title for variation in self.variations):
             return True
-    
-    # Special handling for names with initials
-    display_name = player['player']['name']
-    if '.' in display_name:
-        name_parts = display_name.replace('-', ' ').split()
-        player_surname = normalize_for_comparison(' '.join(name_parts[1:]))
-        player_initial = name_parts[0].replace('.', '').strip().lower()
         
-        title_words = title.lower().split()
-        for i, word in enumerate(title_words):
-            if word.startswith(player_initial):
-                remaining_text = ' '.join(title_words[i:])
-                if player_surname in remaining_text:
-                    return True
-    
-    return False
+        if self.initial is not None:
+            title_words = title.lower().split()
+            for i, word in enumerate(title_words):
+                if word.startswith(self.initial):
+                    remaining_text = ' '.join(title_words[i:])
+                    if self.surname in remaining_text:
+                        return True
+        
+        return False
+
+def is_name_match(player: Dict, suggestion: Dict) -> bool:
+    """Determine if a suggestion matches the player's name.
+
+    Builds the player's matcher on every call; use NameMatcher directly when
+    checking several suggestions for one player.
+    """
+    return NameMatcher(player).matches(suggestion['title'])
 
 def is_valid_player_type(type_lower: str) -> bool:
     """Check if the type indicates an active football player"""
-    is_player = any(player_type in type_lower for player_type in VALID_PLAYER_TYPES)
-    is_active = 'former' not in type_lower and 'retired' not in type_lower
-    
-    return is_player and is_active
+    return (PLAYER_TYPE_PATTERN.search(type_lower) is not None
+            and INACTIVE_TYPE_PATTERN.search(type_lower) is None)
+
+def match_suggestions(matcher: NameMatcher, suggestions: List[Dict]) -> Optional[Dict]:
+    """First suggestion that is an active footballer matching the player's name"""
+    for suggestion in suggestions:
+        if is_valid_player_type(suggestion['type'].lower()) and matcher.matches(suggestion['title']):
+            return suggestion
+    return None
 
 def is_active_player(player: Dict) -> bool:
     """Determine if a player is active based on appearances or bench time"""
@@ -232,47 +327,72 @@ def is_active_player(player: Dict) -> bool:
     return has_appearances or on_bench
 
 # API Functions
-def get_topic_suggestions(pytrends_client, keyword: str, max_retries: int = MAX_RETRIES) -> List[Dict]:
-    """Get topic suggestions with retry logic"""
-    # Ensure minimum delay between API calls
-    if hasattr(get_topic_suggestions, 'last_call'):
-        time_since_last = time.time() - get_topic_suggestions.last_call
-        if time_since_last < MIN_DELAY_BETWEEN_CALLS:
-            time.sleep(MIN_DELAY_BETWEEN_CALLS - time_since_last)
-    
+def get_topic_suggestions(keyword: str, max_retries: int = MAX_RETRIES) -> List[Dict]:
+    """Get topic suggestions with retry logic.
+
+    Each attempt runs on whichever proxy worker is ready first, so a retry after a
+    timeout or a 429 moves to another proxy while the failing one cools down.
+    """
+    global api_call_count
     for attempt in range(max_retries):
-        try:
-            suggestions = pytrends_client.suggestions(keyword=keyword)
-            get_topic_suggestions.last_call = time.time()
-            return suggestions
-            
-        except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout) as e:
-            print(f"Timeout error on attempt {attempt + 1}/{max_retries}")
-            print(f"Request details: keyword='{keyword}'")
-            
-            if attempt < max_retries - 1:
-                delay = RETRY_DELAYS[attempt]
-                print(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
-                continue
+        with trends_pool.worker() as worker:
+            try:
+                # Respect this proxy's pacing and any cooldown
+                worker.wait()
+                with api_call_lock:
+                    api_call_count += 1
+                worker.mark_call()
+                suggestions = worker.client.suggestions(keyword=keyword)
+                worker.mark_success()
+                return suggestions
+                
+            except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout) as e:
+                worker.mark_failure()
+                print(f"Timeout error on attempt {attempt + 1}/{max_retries} via {worker.label}")
+                print(f"Request details: keyword='{keyword}'")
                 
-            raise RetryableError(f"Timeout error after {max_retries} attempts: {str(e)}")
-            
-        except Exception as e:
-            if "429" in str(e):
-                print(f"Rate limit error: {str(e)}")
-                print(f"Attempt {attempt + 1}/{max_retries}, retrying in {RETRY_DELAYS[attempt]}s...")
                 if attempt < max_retries - 1:
-                    time.sleep(RETRY_DELAYS[attempt])
+                    delay = RETRY_DELAYS[attempt]
+                    print(f"Retrying in {delay} seconds...")
+                    worker.cool_down(delay)
                     continue
-                raise RetryableError(f"Rate limit exceeded after {max_retries} attempts: {str(e)}")
-            else:
-                print(f"Non-retryable API error: {str(e)}")
-                print(f"Request details: keyword='{keyword}', attempt={attempt + 1}")
-                raise
+                    
+                raise RetryableError(f"Timeout error after {max_retries} attempts: {str(e)}")
+                
+            except Exception as e:
+                if "429" in str(e):
+                    print(f"Rate limit error on {worker.label}: {str(e)}")
+                    print(f"Attempt {attempt + 1}/{max_retries}, pausing proxy for {RETRY_DELAYS[attempt]}s...")
+                    if attempt < max_retries - 1:
+                        worker.cool_down(RETRY_DELAYS[attempt])
+                        continue
+                    raise RetryableError(f"Rate limit exceeded after {max_retries} attempts: {str(e)}")
+                else:
+                    print(f"Non-retryable API error: {str(e)}")
+                    print(f"Request details: keyword='{keyword}', attempt={attempt + 1}")
+                    raise
 
-def get_search_terms(player: Dict, team_name: str) -> List[str]:
-    """Generate search terms for a player in priority order"""
+def cached_topic_suggestions(keyword: str) -> List[Dict]:
+    """Suggestions for a search term, asking Trends only the first time in a run"""
+    suggestions = suggestion_cache.get(keyword)
+    if suggestions is None:
+        suggestions = get_topic_suggestions(keyword)
+        suggestion_cache.put(keyword, suggestions)
+    return suggestions
+
+def get_name_shape(player: Dict) -> str:
+    """Classify a player's names by how they are usually written"""
+    display_name = player['player']['name'] or ''
+    if '.' in display_name:
+        return 'initials'
+    if len(display_name.split()) == 1:
+        return 'single'
+    if len((player['player']['lastname'] or '').split()) > 1:
+        return 'multi_surname'
+    return 'full'
+
+def get_search_templates(player: Dict, team_name: str) -> List[Tuple[str, str]]:
+    """Generate (template, search term) pairs for a player in default order"""
     search_terms = []
     firstname = player['player']['firstname']
     lastname = player['player']['lastname']
@@ -281,79 +401,101 @@ def get_search_terms(player: Dict, team_name: str) -> List[str]:
         full_name = f"{firstname} {lastname}"
         normalized_name = normalize_name(full_name)
         search_terms.extend([
-            f"{normalized_name} {team_name}",
-            f"{normalized_name} footballer",
-            normalized_name
+            ('full_name_team', f"{normalized_name} {team_name}"),
+            ('full_name_footballer', f"{normalized_name} footballer"),
+            ('full_name', normalized_name)
         ])
     
     # Add display name if different from full name
     display_name = player['player']['name']
     normalized_display = normalize_name(display_name)
     
-    if display_name and normalized_display.lower() not in [term.lower() for term in search_terms]:
+    if display_name and normalized_display.lower() not in [term.lower() for _, term in search_terms]:
         search_terms.extend([
-            f"{normalized_display} {team_name}",
-            f"{normalized_display} footballer",
-            normalized_display
+            ('display_name_team', f"{normalized_display} {team_name}"),
+            ('display_name_footballer', f"{normalized_display} footballer"),
+            ('display_name', normalized_display)
         ])
     
     return search_terms
 
+def order_search_templates(player: Dict, templates: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Sort templates by recorded hit rate for the player's league and name shape,
+    falling back to the shape's rate over all leagues"""
+    shape = get_name_shape(player)
+    league_rates = template_rates.get((player['statistics'][0]['league']['id'], shape), {})
+    shape_rates = template_rates.get((None, shape), {})
+    order = {template: i for i, (template, _) in enumerate(templates)}
+    
+    def sort_key(pair):
+        rate = league_rates.get(pair[0], shape_rates.get(pair[0], TEMPLATE_PRIOR))
+        return -rate, order[pair[0]]
+    
+    return sorted(templates, key=sort_key)
+
+def get_search_terms(player: Dict, team_name: str) -> List[str]:
+    """Generate search terms for a player, most successful template first"""
+    templates = order_search_templates(player, get_search_templates(player, team_name))
+    return [term for _, term in templates]
+
 def find_player_topic(player: Dict, team_name: str) -> tuple:
     """Find Google Trends topic for a player, returning (topic, search_term)"""
     # Clean input names
     team_name = ' '.join(team_name.split())
     search_terms = get_search_terms(player, team_name)
+    matcher = NameMatcher(player)
     
     for search_term in search_terms:
-        suggestions = get_topic_suggestions(pytrends, search_term)
-        
-        for suggestion in suggestions:
-            type_lower = suggestion['type'].lower()
-            
-            if not is_valid_player_type(type_lower):
-                continue
-                
-            if is_name_match(player, suggestion):
-                return suggestion, search_term
+        topic = match_suggestions(matcher, cached_topic_suggestions(search_term))
+        if topic:
+            return topic, search_term
                 
     return None, None
 
+def resolve_player(player: Dict) -> Tuple[Optional[Dict], Optional[str], Optional[Exception]]:
+    """find_player_topic for a pool task; a failure is returned, not raised, so it is
+    handled with its player: retryable ones are skipped, others end the run"""
+    team = ' '.join(player['statistics'][0]['team']['name'].split())
+    try:
+        topic, found_with_term = find_player_topic(player, team)
+        return topic, found_with_term, None
+    except Exception as e:
+        return None, None, e
+
 def add_topic_to_player(player: Dict, topic: Dict) -> None:
     """Add topic data to player object"""
     player['topic_id'] = topic['mid']
     player['topic_title'] = topic['title']
     player['topic_type'] = topic['type']
 
-def load_players() -> List[Dict]:
-    """Load players data from file"""
+def load_players() -> Iterator[Dict]:
+    """Stream players data through the player store"""
     print("Loading players data...")
-    with open(INPUT_FILE, 'r') as f:
-        players = json.load(f)
-    print(f"Loaded {len(players)} total players")
-    return players
+    player_store.sync(INPUT_DATASET, INPUT_FILE)
+    print(f"Loaded {player_store.count(INPUT_DATASET)} total players")
+    return player_store.iter_records(INPUT_DATASET)
 
-def filter_active_players(players: List[Dict]) -> List[Dict]:
-    """Filter out inactive players"""
-    print("\nFiltering active players...")
-    active_players = [player for player in players if is_active_player(player)]
-    print(f"Found {len(active_players)} active players")
-    return active_players
+def filter_active_players(players: Iterable[Dict]) -> Iterator[Dict]:
+    """Filter out inactive players as they stream past"""
+    return (player for player in players if is_active_player(player))
 
-def save_processed_players(processed_players: List[Dict]) -> None:
-    """Save processed players to output file"""
+def save_processed_players() -> None:
+    """Compact the journaled players into the output file"""
     print("\nSaving preprocessed data...")
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(processed_players, f, indent=2)
-    print(f"Saved {len(processed_players)} preprocessed players to {OUTPUT_FILE}")
+    count = player_store.write(OUTPUT_DATASET, preprocess_journal.records())
+    player_store.export(OUTPUT_DATASET, OUTPUT_FILE, indent=2)
+    preprocess_journal.clear()
+    print(f"Saved {count} preprocessed players to {OUTPUT_FILE}")
 
 def print_suggestions_for_player(player_name: str, search_terms: List[str]) -> None:
-    """Print suggestions found for a player"""
+    """Print the suggestions find_player_topic saw for a player, without new API calls"""
     print("Tried following searches:")
     for search_term in search_terms:
         print(f"\nSearch term: '{search_term}'")
-        suggestions = get_topic_suggestions(pytrends, search_term)
-        if suggestions:
+        suggestions = suggestion_cache.get(search_term)
+        if suggestions is None:
+            print("Suggestions no longer cached")
+        elif suggestions:
             print("Got suggestions:")
             for suggestion in suggestions:
                 print(f"- {suggestion['title']} ({suggestion['type']}) [ID: {suggestion['mid']}]")
@@ -367,44 +509,129 @@ def print_progress_update(current: int, total: int, processed_count: int, api_ca
     print(f"Success rate: {success_rate:.1f}%")
     print(f"API calls: {api_calls}\n")
 
-def print_summary(processed_players: List[Dict], skipped_players: List[str], total: int, api_calls: int) -> None:
+def print_template_stats(template_counts: Dict[str, List[int]]) -> None:
+    """Print this run's tries and hits per search template next to the rolling hit rates"""
+    tries = sum(counts[0] for counts in template_counts.values())
+    hits = sum(counts[1] for counts in template_counts.values())
+    if hits:
+        print(f"Searches per resolved player: {tries / hits:.2f}")
+    print("Search templates (hits/tries this run, rolling hit rate):")
+    for template, attempts, rate in topic_cache.template_summary():
+        run_tries, run_hits = template_counts.get(template, [0, 0])
+        print(f"  {template:<24} {run_hits:>5}/{run_tries:<5} {rate * 100:5.1f}% of {attempts}")
+
+def print_summary(processed_count: int, skipped_count: int, total: int, api_calls: int,
+                  template_counts: Optional[Dict[str, List[int]]] = None) -> None:
     """Print summary of processing results"""
+    cache_hits, cache_misses = topic_cache.stats()
     print(f"\n=== Processing Complete ===")
-    print(f"Successfully processed: {len(processed_players)} players")
-    print(f"Skipped: {len(skipped_players)} players")
-    print(f"Success rate: {(len(processed_players)/total*100):.1f}%")
+    print(f"Successfully processed: {processed_count} players")
+    print(f"Skipped: {skipped_count} players")
+    print(f"Success rate: {(processed_count/total*100):.1f}%")
+    print(f"Topic cache: {cache_hits} reused, {cache_misses} resolved")
     print(f"Total API calls: {api_calls}")
+    if template_counts:
+        print_template_stats(template_counts)
 
-def process_players(active_players: List[Dict]) -> tuple:
-    """Process all active players to find their topic IDs"""
+def process_players(active_players: Iterable[Dict], total: int) -> tuple:
+    """Process all active players to find their topic IDs.
+
+    Players stream through one at a time: only the few being resolved are held,
+    and each finished player goes to the journal straight away. Players already in
+    it from an interrupted run are counted but not processed again.
+    """
     print("\nSearching for player topic IDs...")
-    processed_players = []
-    skipped_players = []
-    total = len(active_players)
-    api_calls = 0
-    
-    for i, player in enumerate(active_players, 1):
+    processed_count = 0
+    skipped_count = 0
+    calls_at_start = api_call_count
+    template_counts: Dict[str, List[int]] = {}
+    
+    # Order search templates by what worked in earlier runs
+    template_rates.clear()
+    template_rates.update(topic_cache.template_rates())
+    
+    if preprocess_journal.count:
+        print(f"Resuming: {preprocess_journal.count} players already processed in {preprocess_journal.path}")
+    
+    def lookups() -> Iterator[Tuple[int, Dict, Optional[bool], Optional[TopicEntry]]]:
+        # Reuse the last resolution unless the player is new, moved or stale
+        for position, player in enumerate(active_players):
+            journaled = preprocess_journal.status(position)
+            cached = None if journaled is not None else topic_cache.lookup(
+                player['player']['id'], player['statistics'][0]['team']['id'])
+            yield position, player, journaled, cached
+    
+    def resolve(entry: Tuple[int, Dict, Optional[bool], Optional[TopicEntry]]) -> tuple:
+        _, player, journaled, cached = entry
+        if journaled is not None or cached is not None:
+            return entry, None
+        return entry, resolve_player(player)
+    
+    # The rest resolve concurrently across proxies; results arrive in input order
+    for (position, player, journaled, cached), resolution in trends_pool.imap(resolve, lookups()):
+        i = position + 1
         name = ' '.join(player['player']['name'].split())  # Clean name
         team = ' '.join(player['statistics'][0]['team']['name'].split())
+        player_id = player['player']['id']
+        team_id = player['statistics'][0]['team']['id']
         
         try:
-            search_terms = get_search_terms(player, team)
-            topic, found_with_term = find_player_topic(player, team)
-            api_calls += len(search_terms)  # Count each search as an API call
+            if journaled is not None:
+                if journaled:
+                    processed_count += 1
+                else:
+                    skipped_count += 1
+                continue
+            
+            if cached is not None:
+                if cached.topic:
+                    add_topic_to_player(player, cached.topic)
+                    preprocess_journal.record(i - 1, player)
+                    processed_count += 1
+                    print(f"[{i}/{total}] ✓ Cached topic for {name}: {cached.topic['title']} ({cached.topic['type']})")
+                else:
+                    preprocess_journal.record(i - 1, None)
+                    skipped_count += 1
+                    print(f"[{i}/{total}] ✗ No topic found for {name} (cached)")
+                if i % 100 == 0:
+                    print_progress_update(i, total, processed_count, api_call_count - calls_at_start)
+                continue
+            
+            templates = order_search_templates(player, get_search_templates(player, team))
+            search_terms = [term for _, term in templates]
+            topic, found_with_term, error = resolution
+            if error is not None:
+                raise error
+            topic_cache.put(player_id, team_id, topic, found_with_term)
+            
+            # Templates are tried in order until one finds the topic
+            outcomes = []
+            for template, term in templates:
+                outcomes.append((template, term == found_with_term))
+                counts = template_counts.setdefault(template, [0, 0])
+                counts[0] += 1
+                counts[1] += term == found_with_term
+                if term == found_with_term:
+                    break
+            topic_cache.record_templates(player['statistics'][0]['league']['id'],
+                                         get_name_shape(player), outcomes)
             
             if topic:
                 add_topic_to_player(player, topic)
-                processed_players.append(player)
+                preprocess_journal.record(i - 1, player)
+                processed_count += 1
                 print(f"[{i}/{total}] ✓ Found topic for {name}: {topic['title']} ({topic['type']}) [Search: {found_with_term}]")
             else:
-                skipped_players.append(name)
+                preprocess_journal.record(i - 1, None)
+                skipped_count += 1
                 print(f"[{i}/{total}] ✗ No topic found for {name}")
                 print_suggestions_for_player(name, search_terms)
                 
         except RetryableError as e:
+            # Not journaled, so a restarted run tries this player again
             print(f"[{i}/{total}] ! Retryable error processing {name} ({team})")
             print(f"Error details: {str(e)}")
-            skipped_players.append(name)
+            skipped_count += 1
         except Exception as e:
             print(f"[{i}/{total}] ! Fatal error processing {name} ({team})")
             print(f"Error type: {type(e).__name__}")
@@ -414,30 +641,43 @@ def process_players(active_players: List[Dict]) -> tuple:
         
         # Show stats every 100 players
         if i % 100 == 0:
-            print_progress_update(i, total, len(processed_players), api_calls)
+            print_progress_update(i, total, processed_count, api_call_count - calls_at_start)
     
-    print_summary(processed_players, skipped_players, total, api_calls)
-    return processed_players, skipped_players, api_calls
+    api_calls = api_call_count - calls_at_start
+    print_summary(processed_count, skipped_count, total, api_calls, template_counts)
+    return processed_count, skipped_count, api_calls
 
 def preprocess_players():
     """Main function to preprocess player data"""
     print("\n=== Starting Player Preprocessing ===")
     
-    players = load_players()
-    active_players = filter_active_players(players)
-    processed_players, _, _ = process_players(active_players)
-    
-    if processed_players:
-        save_processed_players(processed_players)
+    # Counted in a first pass so progress can show a total without holding the roster
+    print("\nFiltering active players...")
+    total = sum(1 for _ in filter_active_players(load_players()))
+    print(f"Found {total} active players")
+    
+    # A cold topic cache starts from the last committed output
+    if topic_cache.is_empty() and os.path.exists(OUTPUT_FILE):
+        player_store.sync(OUTPUT_DATASET, OUTPUT_FILE)
+        seeded = topic_cache.seed(player_store.iter_records(OUTPUT_DATASET))
+        print(f"Seeded topic cache with {seeded} players from {OUTPUT_FILE}")
+    
+    # Pick up an interrupted run on the same input
+    if not preprocess_journal.resume(file_signature(INPUT_FILE)):
+        preprocess_journal.start(file_signature(INPUT_FILE))
+    processed_count, _, _ = process_players(filter_active_players(
+        player_store.iter_records(INPUT_DATASET)), total)
+    
+    if processed_count:
+        save_processed_players()
     else:
+        preprocess_journal.clear()
         print("\nFailed to process any players.")
     
     print("\n=== Preprocessing Complete ===")
 
 if __name__ == "__main__":
     try:
-        # Initialize the last call time
-        get_topic_suggestions.last_call = 0
         preprocess_players()
     except Exception as e:
         print(f"\nError during preprocessing: {str(e)}")
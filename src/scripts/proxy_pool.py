@@ -0,0 +1,149 @@
+"""
+Proxy Pool
+
+Shared scheduler for scripts that spread Google Trends calls over PROXY_LIST.
+Every worker owns one client bound to a single proxy and paces its own calls,
+so independent queries run concurrently across proxies while results are
+returned in submission order.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+MAX_CONSECUTIVE_FAILURES = 3  # Failures before a proxy is dropped from the pool
+
+
+class ProxyWorker:
+    """A client bound to one proxy, with its own pacing and health state"""
+    def __init__(self, proxy: Optional[str], client_factory: Callable[[Optional[str]], Any],
+                 min_delay: float, index: int = 0):
+        self.proxy = proxy
+        self.index = index
+        self.min_delay = min_delay
+        self.last_call = 0.0
+        self.cooldown_until = 0.0
+        self.failures = 0
+        self.healthy = True
+        self._client_factory = client_factory
+        self._client = None
+
+    @property
+    def client(self) -> Any:
+        # Built lazily, creating a Trends client already talks to Google
+        if self._client is None:
+            self._client = self._client_factory(self.proxy)
+        return self._client
+
+    @property
+    def ready_at(self) -> float:
+        return max(self.last_call + self.min_delay, self.cooldown_until)
+
+    @property
+    def label(self) -> str:
+        """Loggable name of the proxy; the URL itself may carry credentials"""
+        if self.proxy is None:
+            return 'direct'
+        try:
+            host = urlsplit(self.proxy if '//' in self.proxy else '//' + self.proxy).hostname
+        except ValueError:
+            host = None
+        return f"proxy #{self.index + 1} ({host})" if host else f"proxy #{self.index + 1}"
+
+    def wait(self):
+        """Sleep until this worker may make its next call"""
+        delay = self.ready_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def mark_call(self):
+        self.last_call = time.time()
+
+    def mark_success(self):
+        self.failures = 0
+
+    def mark_failure(self):
+        self.failures += 1
+        if self.failures >= MAX_CONSECUTIVE_FAILURES:
+            self.healthy = False
+
+    def cool_down(self, pause: float):
+        """Keep this worker idle for pause seconds, e.g. after a 429"""
+        self.cooldown_until = time.time() + pause
+
+
+class ProxyPool:
+    """Hand out proxy workers to concurrent tasks, preferring the first ready one"""
+    def __init__(self, proxies: List[str], client_factory: Callable[[Optional[str]], Any],
+                 min_delay: float):
+        self.workers = [ProxyWorker(proxy, client_factory, min_delay, index)
+                        for index, proxy in enumerate(proxies)]
+        if not self.workers:
+            self.workers = [ProxyWorker(None, client_factory, min_delay)]
+        self._idle = list(self.workers)
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return sum(1 for worker in self.workers if worker.healthy)
+
+    def acquire(self) -> ProxyWorker:
+        """Take the idle worker that can call soonest, blocking until one is free"""
+        with self._condition:
+            while not self._idle:
+                self._condition.wait()
+            worker = min(self._idle, key=lambda w: w.ready_at)
+            self._idle.remove(worker)
+            return worker
+
+    def release(self, worker: ProxyWorker):
+        """Return a worker to the pool, dropping it if unhealthy and others remain"""
+        with self._condition:
+            if not worker.healthy and self.size > 0:
+                print(f"Dropping proxy {worker.label} after {worker.failures} consecutive failures")
+            else:
+                worker.healthy = True
+                self._idle.append(worker)
+            self._condition.notify()
+
+    @contextmanager
+    def worker(self) -> Iterator[ProxyWorker]:
+        worker = self.acquire()
+        try:
+            yield worker
+        finally:
+            self.release(worker)
+
+    def imap(self, fn: Callable[[T], R], items: Iterable[T],
+             window: Optional[int] = None) -> Iterator[R]:
+        """Run fn over items concurrently, yielding results in input order.
+
+        items may be a lazy iterable: at most window calls (default four per
+        worker) are submitted ahead of the result being yielded, so a streamed
+        roster is never held in memory whole.
+        """
+        if self.size <= 1:
+            for item in items:
+                yield fn(item)
+            return
+
+        window = window or 4 * self.size
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            try:
+                for item in items:
+                    pending.append(executor.submit(fn, item))
+                    if len(pending) >= window:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,210 @@
+"""
+Global Ranking
+
+Turns every stored Trends observation into one global score per player. Each
+series in a payload is modelled as log(score) = player strength + payload offset,
+so every co-occurrence in any group constrains the ratio between two players.
+The weighted least-squares solution ranks all observed players on one scale
+without further API calls.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from observation_store import ObservationStore, payload_pairs
+
+ZERO_FLOOR = 0.5  # A Trends 0 means "below 0.5", treated as a censored value
+ZERO_WEIGHT = 0.25  # Censored zeros count less than real measurements
+NOISE_VARIANCE = 0.05 ** 2  # Sampling noise of log scores between queries
+RIDGE = 1e-6  # Fixes the free overall scale and keeps isolated players finite
+CG_TOLERANCE = 1e-10
+CG_MAX_ITERATIONS = 2000
+
+
+class RankedPlayer(NamedTuple):
+    identifier: str
+    log_score: float
+    std: float  # Approximate standard error of log_score
+    observations: int  # Number of payloads the player appeared in
+
+
+class RankingSolution(NamedTuple):
+    players: List[RankedPlayer]  # Best first
+    payload_offsets: np.ndarray  # Log offset of every stored payload
+    dispersion: float  # Residual variance relative to the noise model, at least 1
+
+    def score_in_payload(self, player: RankedPlayer, payload_id: int) -> float:
+        """Predicted score of a player had it been queried in the given payload"""
+        return float(np.exp(player.log_score + self.payload_offsets[payload_id]))
+
+
+def _conjugate_gradient(matvec, rhs: np.ndarray) -> np.ndarray:
+    """Solve a symmetric positive definite system given only its matvec"""
+    x = np.zeros_like(rhs)
+    residual = rhs.copy()
+    direction = residual.copy()
+    rs_old = residual @ residual
+    threshold = CG_TOLERANCE * max(rs_old, 1e-30)
+    for _ in range(CG_MAX_ITERATIONS):
+        if rs_old <= threshold:
+            break
+        product = matvec(direction)
+        step = rs_old / (direction @ product)
+        x += step * direction
+        residual -= step * product
+        rs_new = residual @ residual
+        direction = residual + (rs_new / rs_old) * direction
+        rs_old = rs_new
+    return x
+
+
+def _row_weights(scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Log targets and inverse-variance weights of stored row scores"""
+    censored = scores < ZERO_FLOOR
+    values = np.where(censored, ZERO_FLOOR, scores)
+    # Rounding to whole numbers matters most for small values
+    weights = 1.0 / (NOISE_VARIANCE + (0.29 / values) ** 2)
+    weights[censored] *= ZERO_WEIGHT
+    return np.log(values), weights
+
+
+def solve_global_ranking(store: ObservationStore, method: str = 'peak') -> RankingSolution:
+    """Weighted least-squares log scores for every identifier in the store.
+
+    Unknowns are one log strength per identifier and one offset per payload. The
+    normal equations are solved with conjugate gradients over a sparse design
+    matrix (two non-zeros per row), so memory stays linear in the observations.
+    Standard errors use the residual variance and each player's total weight,
+    which ignores the uncertainty of the payload offsets and so reads low for
+    players seen only once.
+    """
+    scores = store.scores(method)
+    n_rows = len(scores)
+    n_keys = len(store.keys)
+    n_payloads = len(store.payload_rows)
+    if n_rows == 0:
+        return RankingSolution([], np.zeros(0), 1.0)
+
+    player = store.row_key[:n_rows].astype(np.intp)
+    payload = store.row_payload[:n_rows].astype(np.intp)
+
+    target, weights = _row_weights(scores)
+
+    def matvec(z: np.ndarray) -> np.ndarray:
+        fitted = z[player] + z[n_keys + payload]
+        weighted = weights * fitted
+        return np.concatenate([
+            np.bincount(player, weighted, minlength=n_keys),
+            np.bincount(payload, weighted, minlength=n_payloads),
+        ]) + RIDGE * z
+
+    rhs = np.concatenate([
+        np.bincount(player, weights * target, minlength=n_keys),
+        np.bincount(payload, weights * target, minlength=n_payloads),
+    ])
+    solution = _conjugate_gradient(matvec, rhs)
+    strengths = solution[:n_keys]
+    offsets = solution[n_keys:]
+
+    residuals = target - strengths[player] - offsets[payload]
+    dof = max(n_rows - n_keys - n_payloads + 1, 1)
+    residual_variance = float(weights @ residuals ** 2) / dof
+    player_weight = np.bincount(player, weights, minlength=n_keys)
+    counts = np.bincount(player, minlength=n_keys)
+    std = np.sqrt(residual_variance / np.maximum(player_weight, 1e-12))
+
+    players = [
+        RankedPlayer(store.keys[i], float(strengths[i]), float(std[i]), int(counts[i]))
+        for i in np.argsort(-strengths, kind='stable') if counts[i] > 0
+    ]
+    return RankingSolution(players, offsets, max(residual_variance, 1.0))
+
+
+def difference_std(store: ObservationStore, solution: RankingSolution, reference: str,
+                   method: str = 'peak') -> Dict[str, float]:
+    """Standard error of every identifier's log score minus the reference's.
+
+    Exact errors need the inverse of the normal matrix. Instead, two series in one
+    payload give a direct estimate of their log ratio, and chaining the most
+    precise pairs gives the variance along the best path to the reference. The
+    least-squares estimate pools every path, so its error is never larger and the
+    bound errs towards more sampling. Identifiers without a path get inf.
+    """
+    scores = store.scores(method)
+    n_rows = len(scores)
+    if reference not in store.keys or n_rows == 0:
+        return {}
+
+    firsts = np.array([first for first, _ in store.payload_rows])
+    counts = np.array([count for _, count in store.payload_rows])
+    src, dst = payload_pairs(firsts, counts)
+    _, weights = _row_weights(scores)
+    variance = 1.0 / weights
+    row_key = store.row_key[:n_rows].astype(np.int64)
+
+    # Repeated direct comparisons of the same pair pool like parallel measurements
+    n_keys = len(store.keys)
+    pairs, pair_index = np.unique(row_key[src] * n_keys + row_key[dst], return_inverse=True)
+    edge_src, edge_dst = pairs // n_keys, pairs % n_keys
+    edge_variance = 1.0 / np.bincount(pair_index, 1.0 / (variance[src] + variance[dst]))
+
+    path = np.full(n_keys, np.inf)
+    ref = store.keys.index(reference)
+    path[ref] = 0.0
+    for _ in range(n_keys):
+        new_path = path.copy()
+        np.minimum.at(new_path, edge_src, path[edge_dst] + edge_variance)
+        if np.array_equal(new_path, path):
+            break
+        path = new_path
+
+    std = np.sqrt(path * solution.dispersion)
+    return dict(zip(store.keys, std.tolist()))
+
+
+def rescaled_series(store: ObservationStore, solution: RankingSolution, identifier: str,
+                    target_payload: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """An identifier's clearest stored series, rescaled onto another payload's scale.
+
+    The clearest series is the one with the highest peak, which suffers least from
+    rounding to whole numbers.
+    """
+    best = None
+    for payload_id in range(len(store.payload_rows)):
+        series = store.series(payload_id)
+        if identifier in series:
+            stamps, values = series[identifier]
+            if best is None or values.max(initial=0) > best[1].max(initial=0):
+                best = (stamps, values, payload_id)
+
+    if best is None:
+        return None
+    stamps, values, payload_id = best
+    offsets = solution.payload_offsets
+    return stamps, values * np.exp(offsets[target_payload] - offsets[payload_id])
+
+
+def connected_components(store: ObservationStore) -> Dict[str, int]:
+    """Component label of every identifier.
+
+    Identifiers share a label when a chain of payloads links them, i.e. when the
+    ratio between their scores is known at all.
+    """
+    parent = list(range(len(store.keys)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for first, count in store.payload_rows:
+        members = store.row_key[first:first + count].tolist()
+        root = find(members[0])
+        for key in members[1:]:
+            other = find(key)
+            if other != root:
+                parent[other] = root
+
+    return {identifier: find(i) for i, identifier in enumerate(store.keys)}
@@ -0,0 +1,106 @@
+"""
+Roster Pages
+
+Last seen content of every API-Football players page, with a content hash, when
+it was fetched and when it last changed. fetch_players.py plans its requests
+from it: when the daily quota does not cover every page, pages never fetched or
+that changed last time go first, and the rest of the roster is assembled from
+the stored pages.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+CACHE_FILE = os.environ.get('ROSTER_PAGES_FILE', 'data/roster_pages.sqlite')
+
+
+def content_hash(obj) -> str:
+    """Stable hash of a JSON-serialisable value, independent of key order"""
+    text = json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class PageEntry(NamedTuple):
+    league_id: int
+    season: int
+    page: int
+    total: int  # paging.total reported with this page
+    hash: str
+    fetched_at: float
+    changed_at: float
+
+    @property
+    def changed_last_time(self) -> bool:
+        return self.changed_at == self.fetched_at
+
+
+class RosterPages:
+    """SQLite store of players pages by (league, season, page)"""
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "league_id INTEGER, season INTEGER, page INTEGER, total INTEGER NOT NULL, "
+                "hash TEXT NOT NULL, fetched_at REAL NOT NULL, changed_at REAL NOT NULL, "
+                "players TEXT NOT NULL, PRIMARY KEY (league_id, season, page))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def put(self, league_id: int, season: int, page: int, total: int, players: List[Dict]) -> bool:
+        """Store a fetched page; returns True when its content differs from the stored one"""
+        page_hash = content_hash(players)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT hash, changed_at FROM pages WHERE league_id = ? AND season = ? AND page = ?",
+                (league_id, season, page)
+            ).fetchone()
+            changed = row is None or row[0] != page_hash
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (league_id, season, page, total, page_hash, now, now if changed else row[1],
+                 json.dumps(players, ensure_ascii=False))
+            )
+            conn.commit()
+        return changed
+
+    def entries(self, league_id: int, season: int) -> Dict[int, PageEntry]:
+        """Stored pages of a league season by page number"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT league_id, season, page, total, hash, fetched_at, changed_at FROM pages "
+                "WHERE league_id = ? AND season = ?", (league_id, season)
+            ).fetchall()
+        return {row[2]: PageEntry(*row) for row in rows}
+
+    def players(self, league_id: int, season: int, page: int) -> Optional[List[Dict]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT players FROM pages WHERE league_id = ? AND season = ? AND page = ?",
+                (league_id, season, page)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest_season(self, league_id: int) -> Optional[int]:
+        """Most recent season stored for a league, for runs that cannot afford the lookup"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(season) FROM pages WHERE league_id = ?", (league_id,)
+            ).fetchone()
+        return row[0]
@@ -0,0 +1,217 @@
+"""
+Run Journal
+
+Append-only NDJSON journal for resuming an interrupted tournament. The first
+line records the input signature and the shuffled player order, every later line
+the scores of one completed group under a step label. Because the tournament is
+deterministic given its order and group scores, replaying the journal rebuilds
+the current round, surviving players, knockout standings and best 5th without
+repeating any call.
+
+PreprocessJournal does the same for preprocessing: one line per finished player,
+compacted into the output file once every player is done.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+JOURNAL_FILE = os.environ.get('TOURNAMENT_JOURNAL_FILE', 'data/tournament_journal.ndjson')
+JOURNAL_MAX_AGE = 6 * 3600  # Older journals belong to a previous scheduled run
+PREPROCESS_JOURNAL_FILE = os.environ.get('PREPROCESS_JOURNAL_FILE', 'data/preprocess_journal.ndjson')
+PREPROCESS_JOURNAL_MAX_AGE = 2 * 86400  # A restart within two days picks up where the run stopped
+NOT_JOURNALED = -1  # Preprocess journal index values that are not line offsets
+NO_TOPIC = -2
+
+
+def file_signature(path: str) -> str:
+    """Content hash of an input file, so a journal never outlives its input"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """Record and replay group results of a single run"""
+    def __init__(self, path: str = JOURNAL_FILE, max_age: float = JOURNAL_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.order: List[int] = []  # Indices into the active player list
+        self.replayed = 0
+        self._steps: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def resume(self, signature: str, mode: str) -> Optional[List[int]]:
+        """Load a matching journal and return its player order, or None to start fresh"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return None
+
+        if (header.get('signature') != signature or header.get('mode') != mode
+                or time.time() - header.get('started_at', 0) > self.max_age):
+            return None
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # Torn last line from a crash mid-write
+            self._steps[entry['step']] = entry
+
+        self.order = header['order']
+        return self.order
+
+    def start(self, signature: str, mode: str, order: List[int]):
+        """Begin a new journal for a fresh run"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.order = order
+        self._steps = {}
+        header = {'signature': signature, 'mode': mode, 'started_at': time.time(), 'order': order}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+
+    def lookup(self, step: str, members: List[str]) -> Optional[Dict[str, float]]:
+        """Return journaled scores for a step if it was run with the same members"""
+        entry = self._steps.get(step)
+        if entry is None or entry['members'] != members:
+            return None
+        self.replayed += 1
+        return entry['scores']
+
+    def record(self, step: str, members: List[str], scores: Dict[str, float]):
+        """Append a completed group and flush it to disk"""
+        entry = {'step': step, 'members': members,
+                 'scores': {name: float(score) for name, score in scores.items()}}
+        with self._lock:
+            self._steps[step] = entry
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self):
+        """Remove the journal once a run has completed"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PreprocessJournal:
+    """Record each preprocessed player as it finishes, and replay them after a restart.
+
+    Lines are (position, record) with record None for players without a topic.
+    Positions index the active players of the input file named by the header
+    signature, so entries from a different input are never reused.
+    """
+    def __init__(self, path: str = PREPROCESS_JOURNAL_FILE, max_age: float = PREPROCESS_JOURNAL_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        # Byte offset of each position's line, or NOT_JOURNALED / NO_TOPIC; eight
+        # bytes per player keeps a large roster's journal index small
+        self._offsets = array('q')
+        self.count = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def resume(self, signature: str) -> bool:
+        """Load a journal for the same input; returns False when starting fresh"""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return False
+
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return False
+            if (header.get('signature') != signature
+                    or time.time() - header.get('started_at', 0) > self.max_age):
+                return False
+
+            offset = f.tell()
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Torn last line from a crash mid-write
+                self._set(entry['position'], offset if entry['record'] is not None else NO_TOPIC)
+                offset += len(line)
+
+        # Drop a torn tail so new lines start on a line boundary
+        with open(self.path, 'r+b') as f:
+            f.truncate(offset)
+        self._file = open(self.path, 'ab')
+        return True
+
+    def start(self, signature: str):
+        """Begin a new journal for a fresh run"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._offsets = array('q')
+        self.count = 0
+        self._file = open(self.path, 'wb')
+        self._file.write(json.dumps({'signature': signature, 'started_at': time.time()}).encode('utf-8') + b'\n')
+        self._file.flush()
+
+    def record(self, position: int, record: Optional[Dict]):
+        """Append one finished player.
+
+        Lines are flushed but not fsynced: a killed or crashed process loses
+        nothing, and a sync per player would cost more than the cached lookups.
+        """
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(json.dumps({'position': position, 'record': record}).encode('utf-8') + b'\n')
+            self._file.flush()
+            self._set(position, offset if record is not None else NO_TOPIC)
+
+    def _set(self, position: int, value: int):
+        if position >= len(self._offsets):
+            self._offsets.extend([NOT_JOURNALED] * (position + 1 - len(self._offsets)))
+        if self._offsets[position] == NOT_JOURNALED:
+            self.count += 1
+        self._offsets[position] = value
+
+    def status(self, position: int) -> Optional[bool]:
+        """Whether a journaled player found a topic, or None when it is not journaled"""
+        with self._lock:
+            value = self._offsets[position] if position < len(self._offsets) else NOT_JOURNALED
+        return None if value == NOT_JOURNALED else value != NO_TOPIC
+
+    def records(self) -> Iterator[Dict]:
+        """Stream the journaled players with a topic, in position order"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            offsets = array('q', self._offsets)
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                if offset < 0:
+                    continue
+                f.seek(offset)
+                yield json.loads(f.readline())['record']
+
+    def clear(self):
+        """Remove the journal once its players are compacted into the output"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
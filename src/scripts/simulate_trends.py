@@ -0,0 +1,139 @@
+"""
+Trends Load Test
+
+Runs the trending footballers ranking against the simulated Trends backend and
+reports API calls, wall time and accuracy against the simulator's ground truth.
+No network access is needed.
+
+Example:
+    python src/scripts/simulate_trends.py --players 10000 --proxies 8 --modes tournament anchor
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+os.environ['TRENDS_BACKEND'] = 'simulated'
+
+from observation_store import ObservationStore
+from player_store import PlayerStore
+from proxy_pool import ProxyPool
+from run_journal import RunJournal
+from trends_cache import TrendsCache
+from trends_simulator import SyntheticPopulation, set_simulation
+import trending_footballers as tf
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=2500, help='Synthetic roster size')
+    parser.add_argument('--seed', type=int, default=42, help='Population and shuffle seed')
+    parser.add_argument('--modes', nargs='+', default=['tournament', 'anchor'],
+                        help='Ranking modes to compare')
+    parser.add_argument('--proxies', type=int, default=1, help='Simulated proxy count')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean seconds per Trends call')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of calls answered 429')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='Share of calls answered empty')
+    parser.add_argument('--noise', type=float, default=0.05, help='Sampling noise of each response')
+    parser.add_argument('--time-scale', type=float, default=0.0,
+                        help='Multiplier for production pacing delays (0 disables pacing)')
+    parser.add_argument('--top-n', type=int, default=5, help='Players written to the output')
+    parser.add_argument('--verbose', action='store_true', help='Show the ranking output')
+    return parser.parse_args()
+
+
+def configure_run(workdir: str, mode: str, proxies: List[str], time_scale: float, top_n: int):
+    """Point the ranking at a fresh workspace and scale its pacing"""
+    tf.INPUT_FILE = os.path.join(workdir, 'preprocessed_players.json')
+    tf.OUTPUT_FILE = os.path.join(workdir, f'{mode}_trending_footballers.json')
+    tf.RANKING_FILE = os.path.join(workdir, f'{mode}_global_ranking.json')
+    tf.TOP_N = top_n
+    tf.RANKING_MODE = mode
+    tf.RATE_LIMIT_PAUSE = 60 * time_scale
+    tf.RETRY_DELAYS = [delay * time_scale for delay in [2, 5, 10]]
+    tf.trends_pool = ProxyPool(proxies, tf.create_trends_client, 1 * time_scale)
+    tf.trends_cache = TrendsCache(os.path.join(workdir, f'{mode}_cache.sqlite'))
+    tf.run_journal = RunJournal(os.path.join(workdir, f'{mode}_journal.ndjson'))
+    tf.observations = ObservationStore()
+    tf.player_store = PlayerStore(os.path.join(workdir, 'players.sqlite'))
+
+
+def run_mode(population: SyntheticPopulation, workdir: str, mode: str,
+             args: argparse.Namespace) -> Dict:
+    """Run one ranking mode and measure it against the ground truth"""
+    proxies = [f'sim-proxy-{i}' for i in range(args.proxies)] if args.proxies > 1 else []
+    configure_run(workdir, mode, proxies, args.time_scale, args.top_n)
+    random.seed(args.seed)
+
+    calls_before = population.calls
+    rate_limited_before = population.rate_limited
+    empty_before = population.empty
+    start = time.time()
+    output = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        tf.fetch_trending_footballers()
+    wall_time = time.time() - start
+
+    with open(tf.OUTPUT_FILE, 'r') as f:
+        ranked = [p['topic_id'] for p in json.load(f)['players']]
+    truth = population.ground_truth(len(ranked))
+
+    # Rank correlation of the global ranking with the true peaks
+    with open(tf.RANKING_FILE, 'r') as f:
+        global_ranking = json.load(f)['players']
+    estimated = [p['log_score'] for p in global_ranking]
+    indices = [population.by_topic[p['topic_id']] for p in global_ranking]
+    rank_corr = pd.Series(estimated).rank().corr(pd.Series(population.peaks[indices]).rank())
+
+    return {
+        'mode': mode,
+        'calls': population.calls - calls_before,
+        'rate_limited': population.rate_limited - rate_limited_before,
+        'empty': population.empty - empty_before,
+        'wall_time': wall_time,
+        'top_overlap': len(set(ranked) & set(truth)),
+        'exact_order': ranked == truth,
+        'size': len(ranked),
+        'ranked': len(indices),
+        'rank_corr': rank_corr,
+    }
+
+
+def main():
+    args = parse_args()
+    print(f"Building synthetic population of {args.players} players...")
+    population = SyntheticPopulation(
+        size=args.players,
+        seed=args.seed,
+        noise=args.noise,
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit_rate,
+        empty_rate=args.empty_rate,
+    )
+    set_simulation(population)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, 'preprocessed_players.json'), 'w') as f:
+            json.dump(population.players, f)
+
+        results = [run_mode(population, workdir, mode, args) for mode in args.modes]
+
+    print(f"\n{'Mode':<12} {'Calls':>7} {'429s':>6} {'Empty':>6} {'Wall':>9} {'Top-N hit':>10} {'Exact':>6}"
+          f" {'Ranked':>7} {'Rank corr':>10}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['calls']:>7} {r['rate_limited']:>6} {r['empty']:>6} "
+              f"{r['wall_time']:>8.1f}s {r['top_overlap']:>5}/{r['size']:<4} {str(r['exact_order']):>6}"
+              f" {r['ranked']:>7} {r['rank_corr']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
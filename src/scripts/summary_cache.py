@@ -0,0 +1,123 @@
+"""
+Summary Cache
+
+Disk-backed cache for Gemini trend summaries. Entries are keyed by a hash of the
+prompt inputs (model, topic title and the normalised titles and descriptions of
+the articles), so a player who stays in the top five with the same news is
+summarised once. Entries expire after a TTL and the least recently used are
+evicted beyond a size bound. The last good summary of every topic is kept apart
+from the cache, as a fallback for when Gemini fails.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+CACHE_FILE = os.environ.get('SUMMARY_CACHE_FILE', 'data/summary_cache.sqlite')
+SUMMARY_TTL = 3 * 86400  # Seconds a summary of unchanged articles is reused
+MAX_SUMMARIES = 500  # Cached summaries kept, least recently used evicted first
+MAX_FALLBACKS = 500  # Topics whose last good summary is kept
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Case and whitespace-insensitive form of an article field"""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def summary_key(model: str, topic_title: str, articles: Iterable[Tuple[str, str]]) -> str:
+    """Content key of a summary prompt from (title, description) pairs.
+
+    Articles are sorted, so the same set returned in another order still hits.
+    """
+    normalized = sorted((normalize_text(title), normalize_text(description))
+                        for title, description in articles)
+    raw = json.dumps([model, normalize_text(topic_title), normalized], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SummaryCache:
+    """SQLite-backed summary cache with a last-good fallback per topic"""
+    def __init__(self, path: str = CACHE_FILE, ttl: float = SUMMARY_TTL,
+                 max_summaries: int = MAX_SUMMARIES, max_fallbacks: int = MAX_FALLBACKS):
+        self.path = path
+        self.ttl = ttl
+        self.max_summaries = max_summaries
+        self.max_fallbacks = max_fallbacks
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL, "
+                "used_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS last_good ("
+                "topic_title TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached summary for a prompt key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE summaries SET used_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, topic_title: str, summary: str):
+        """Store a good summary for a prompt key and as the topic's fallback"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                         (key, summary, now, now))
+            conn.execute("INSERT OR REPLACE INTO last_good VALUES (?, ?, ?)",
+                         (topic_title, summary, now))
+            conn.execute(
+                "DELETE FROM summaries WHERE key NOT IN ("
+                "SELECT key FROM summaries ORDER BY used_at DESC LIMIT ?)", (self.max_summaries,)
+            )
+            conn.execute(
+                "DELETE FROM last_good WHERE topic_title NOT IN ("
+                "SELECT topic_title FROM last_good ORDER BY created_at DESC LIMIT ?)",
+                (self.max_fallbacks,)
+            )
+            conn.commit()
+
+    def last_good(self, topic_title: str) -> Optional[str]:
+        """Most recent good summary of a topic regardless of age"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT summary FROM last_good WHERE topic_title = ?", (topic_title,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Tuple[int, int]:
+        return self.hits, self.misses
@@ -0,0 +1,197 @@
+"""
+Topic Cache
+
+Persistent record of how each API-Football player resolved to a Google Trends
+topic: the topic (mid, title, type), the search term that matched, the team it
+was resolved with and when it was last verified. Players that could not be
+resolved are kept as negative entries. Preprocessing only re-resolves players
+that are new, changed team, or whose entry went stale, so a weekly run touches a
+small share of the roster.
+
+It also keeps a rolling hit rate for every search term template per league and
+name shape, so the next run tries the templates that usually work first.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CACHE_FILE = os.environ.get('TOPIC_CACHE_FILE', 'data/topic_cache.sqlite')
+TOPIC_TTL = 60 * 86400  # Re-verify resolved topics every ~2 months
+NEGATIVE_TTL = 14 * 86400  # Unresolved players get another try after two weekly runs
+TTL_JITTER = 0.25  # Spread expiry +/-25% per player so re-verification does not bunch up
+TEMPLATE_RATE_WINDOW = 50  # Template hit rates average roughly the last 50 tries
+TEMPLATE_MIN_ATTEMPTS = 10  # Tries before a template's hit rate affects the order
+
+
+class TopicEntry:
+    """A cached resolution; topic is None for a negative entry"""
+    __slots__ = ('player_id', 'team_id', 'topic', 'search_term', 'verified_at')
+
+    def __init__(self, player_id: int, team_id: Optional[int], topic: Optional[Dict],
+                 search_term: Optional[str], verified_at: float):
+        self.player_id = player_id
+        self.team_id = team_id
+        self.topic = topic
+        self.search_term = search_term
+        self.verified_at = verified_at
+
+
+def _jitter(player_id: int) -> float:
+    """Deterministic factor in [1 - TTL_JITTER, 1 + TTL_JITTER] per player"""
+    digest = hashlib.sha1(str(player_id).encode('utf-8')).digest()
+    return 1 - TTL_JITTER + 2 * TTL_JITTER * int.from_bytes(digest[:4], 'little') / 0xFFFFFFFF
+
+
+class TopicCache:
+    """SQLite-backed player ID to topic resolution cache"""
+    def __init__(self, path: str = CACHE_FILE, ttl: float = TOPIC_TTL,
+                 negative_ttl: float = NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS topics ("
+                "player_id INTEGER PRIMARY KEY, team_id INTEGER, mid TEXT, title TEXT, "
+                "type TEXT, search_term TEXT, verified_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS template_stats ("
+                "league_id INTEGER, shape TEXT, template TEXT, attempts INTEGER NOT NULL, "
+                "hit_rate REAL NOT NULL, PRIMARY KEY (league_id, shape, template))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, player_id: int) -> Optional[TopicEntry]:
+        """Cached entry for a player regardless of age"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT team_id, mid, title, type, search_term, verified_at FROM topics "
+                "WHERE player_id = ?", (player_id,)
+            ).fetchone()
+        if not row:
+            return None
+        team_id, mid, title, topic_type, search_term, verified_at = row
+        topic = {'mid': mid, 'title': title, 'type': topic_type} if mid else None
+        return TopicEntry(player_id, team_id, topic, search_term, verified_at)
+
+    def lookup(self, player_id: int, team_id: Optional[int]) -> Optional[TopicEntry]:
+        """Fresh entry for a player at this team, or None when it must be re-resolved"""
+        entry = self.get(player_id)
+        if entry is None or entry.team_id != team_id:
+            self.misses += 1
+            return None
+
+        ttl = self.ttl if entry.topic else self.negative_ttl
+        if time.time() - entry.verified_at > ttl * _jitter(player_id):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, player_id: int, team_id: Optional[int], topic: Optional[Dict],
+            search_term: Optional[str], verified_at: Optional[float] = None):
+        """Record a resolution, or a negative entry when topic is None"""
+        topic = topic or {}
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO topics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (player_id, team_id, topic.get('mid'), topic.get('title'), topic.get('type'),
+                 search_term, time.time() if verified_at is None else verified_at)
+            )
+            conn.commit()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._connect().execute("SELECT 1 FROM topics LIMIT 1").fetchone() is None
+
+    def seed(self, players: Iterable[Dict], verified_at: Optional[float] = None) -> int:
+        """Fill an empty cache from previously preprocessed players.
+
+        The last committed output is a resolution verified at its run, so a cold
+        cache (first run, or an evicted CI cache) starts from it instead of
+        re-resolving the whole roster. Returns the number of entries added.
+        """
+        verified_at = time.time() if verified_at is None else verified_at
+        rows = []
+        for player in players:
+            if not player.get('topic_id'):
+                continue
+            rows.append((player['player']['id'], player['statistics'][0]['team']['id'],
+                         player['topic_id'], player.get('topic_title'), player.get('topic_type'),
+                         None, verified_at))
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR IGNORE INTO topics VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+        return len(rows)
+
+    def stats(self) -> Tuple[int, int]:
+        return self.hits, self.misses
+
+    def record_templates(self, league_id: Optional[int], shape: str,
+                         outcomes: List[Tuple[str, bool]]):
+        """Update rolling hit rates with the templates tried for one player, in order"""
+        with self._lock:
+            conn = self._connect()
+            for template, hit in outcomes:
+                row = conn.execute(
+                    "SELECT attempts, hit_rate FROM template_stats "
+                    "WHERE league_id IS ? AND shape = ? AND template = ?",
+                    (league_id, shape, template)
+                ).fetchone()
+                attempts, rate = row if row else (0, 0.0)
+                attempts += 1
+                # Plain mean for the first tries, then an exponential moving average
+                weight = max(1 / attempts, 1 / TEMPLATE_RATE_WINDOW)
+                rate += weight * (float(hit) - rate)
+                conn.execute("INSERT OR REPLACE INTO template_stats VALUES (?, ?, ?, ?, ?)",
+                             (league_id, shape, template, attempts, rate))
+            conn.commit()
+
+    def template_rates(self) -> Dict[Tuple[Optional[int], str], Dict[str, float]]:
+        """Hit rate of every template tried often enough, by (league_id, shape).
+
+        Entries under (None, shape) pool all leagues, as a fallback for leagues with
+        little history.
+        """
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT league_id, shape, template, hit_rate FROM template_stats "
+                "WHERE attempts >= ?", (TEMPLATE_MIN_ATTEMPTS,)
+            ).fetchall()
+            rows += conn.execute(
+                "SELECT NULL, shape, template, SUM(attempts * hit_rate) / SUM(attempts) "
+                "FROM template_stats GROUP BY shape, template HAVING SUM(attempts) >= ?",
+                (TEMPLATE_MIN_ATTEMPTS,)
+            ).fetchall()
+        rates: Dict[Tuple[Optional[int], str], Dict[str, float]] = {}
+        for league_id, shape, template, rate in rows:
+            rates.setdefault((league_id, shape), {})[template] = rate
+        return rates
+
+    def template_summary(self) -> List[Tuple[str, int, float]]:
+        """(template, attempts, attempt-weighted rolling hit rate) over all leagues and shapes"""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT template, SUM(attempts), SUM(attempts * hit_rate) / SUM(attempts) "
+                "FROM template_stats GROUP BY template ORDER BY template"
+            ).fetchall()
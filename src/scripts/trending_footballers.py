@@ -3,15 +3,26 @@ Trending Footballers Script
 
 This script runs a tournament-style competition to find the most trending footballers
 using Google Trends data. It processes players in groups and ultimately determines
-the top 5 trending players.
+the top trending players (5 by default, TOP_N to change), plus a least-squares
+ranking of every player observed along the way.
 """
 
 import os
 import json
-import time
+import math
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any, Tuple
-from pytrends.request import TrendReq
+from statistics import NormalDist
+from typing import Dict, List, Optional, Set, Tuple
+from player_records import PlayerRecord, hydrate, load_records
+from player_store import PlayerStore
+from proxy_pool import ProxyPool
+from ranking import (RankedPlayer, RankingSolution, connected_components, difference_std,
+                     rescaled_series, solve_global_ranking)
+from observation_store import SCORING_METHODS, ObservationStore
+from run_journal import RunJournal, file_signature
+from trends_backend import TrendsBackend, create_client
+from trends_cache import TrendsCache, make_cache_key
 import pandas as pd
 import random
 
@@ -20,7 +31,9 @@ pd.set_option('future.no_silent_downcasting', True)
 
 # Constants
 INPUT_FILE = 'public/preprocessed_players.json'
+PLAYER_DATASET = 'preprocessed'  # Player store dataset mirroring INPUT_FILE
 OUTPUT_FILE = 'public/trending_footballers.json'
+RANKING_FILE = 'data/global_ranking.json'  # Full ranking for inspection; not published
 PROXIES = os.environ['PROXY_LIST'].split(',') if 'PROXY_LIST' in os.environ else []
 random.shuffle(PROXIES)  # Shuffle proxies for better load distribution
 MIN_DELAY_BETWEEN_CALLS = 1  # Minimum seconds between API calls
@@ -29,6 +42,20 @@ MAX_RETRIES = 3
 MAX_NO_DATA_RETRIES = 2
 RETRY_DELAYS = [2, 5, 10]  # Increasing delays between retries
 TOURNAMENT_THRESHOLD = 25  # When to switch to final round
+TIMEFRAME = 'now 1-d'
+SCORING_METHOD = os.environ.get('SCORING_METHOD', 'peak')  # One of observation_store.SCORING_METHODS
+GEO = ''
+RANKING_MODE = os.environ.get('RANKING_MODE', 'tournament')  # 'tournament', 'anchor' or 'adaptive'
+ANCHOR_MIN_SIGNAL = 5  # Rung scores below this are too coarse to scale a payload
+ANCHOR_RUNG_STEP = 10  # Target popularity ratio between neighbouring ladder rungs
+ANCHOR_MAX_RUNGS = 3  # Maximum extra rungs added above or below the base anchor
+ANCHOR_FINALISTS = 8  # Top anchor-scored players passed to the final round
+ANCHOR_EMPTY_REQUERIES = 2  # Extra passes for players whose payload came back without data
+BOUND_SLACK = 1.15  # Widen each pairwise score bound to absorb Trends sampling noise
+TOP_N = int(os.environ.get('TOP_N', 5))  # Players written to OUTPUT_FILE
+ADAPTIVE_CONFIDENCE = float(os.environ.get('ADAPTIVE_CONFIDENCE', 0.95))  # Required certainty of the top set
+ADAPTIVE_TOLERANCE = 1.05  # Players within 5% of the top set boundary count as tied
+ADAPTIVE_MAX_CALLS = 400  # Adaptive calls after screening before settling for the estimate
 
 # ANSI color codes
 class Colors:
@@ -40,13 +67,24 @@ class Colors:
 
 # Initialize global variables
 api_calls_counter = 0
-pytrends = TrendReq(
-    timeout=(3.05, 30),
-    retries=MAX_RETRIES,
-    backoff_factor=3.0,
-    proxies=PROXIES
-)
-get_trends_data_last_call = 0  # Track last API call time
+api_calls_lock = threading.Lock()
+
+
+def create_trends_client(proxy: Optional[str]) -> TrendsBackend:
+    """Create a Trends client bound to a single proxy (or none)"""
+    return create_client(
+        timeout=(3.05, 30),
+        retries=MAX_RETRIES,
+        backoff_factor=3.0,
+        proxies=[proxy] if proxy else []
+    )
+
+
+trends_pool = ProxyPool(PROXIES, create_trends_client, MIN_DELAY_BETWEEN_CALLS)
+trends_cache = TrendsCache()
+player_store = PlayerStore()
+run_journal = RunJournal()
+observations = ObservationStore()
 
 
 class TimingStats:
@@ -116,13 +154,14 @@ class ProgressDisplay:
         print(f"\r{Colors.BLUE}▶{Colors.RESET} [{bar}] {percent}% ({self.current}/{self.total}) | "
               f"{' | '.join(timing_info)}", end='', flush=True)
     
-    def show_group_result(self, group_num: int, players: List[Dict], 
+    def show_group_result(self, group_num: int, players: List[PlayerRecord], 
                           scores: Dict[str, float], winners: List[str]):
+        """Print a group's scores; scores and winners are keyed by player identifier"""
         player_scores = []
         for player in players:
-            name = player['player']['name']
-            score = scores.get(name, 0)
-            if name in winners:
+            name = player.name
+            score = scores.get(player.identifier, 0)
+            if player.identifier in winners:
                 player_scores.append(f"{Colors.GREEN}★{name}({score}){Colors.RESET}")
             else:
                 player_scores.append(f"{name}({score})")
@@ -144,159 +183,158 @@ def log_message(message: str, color: Optional[str] = None):
         print(message)
 
 
-def format_player_name_with_score(player: Dict, score: float, prefix: str = "") -> str:
+def format_player_name_with_score(player: PlayerRecord, score: float, prefix: str = "") -> str:
     """Format a player's name with score and team"""
-    name = player['player']['name']
-    team = player['statistics'][0]['team']['name']
-    return f"{prefix}{name:<20} {score:>3} ({team})"
+    return f"{prefix}{player.name:<20} {score:>3} ({player.team})"
 
 
-def get_player_identifier(player: Dict) -> str:
-    """Get the appropriate identifier for a player (topic ID or name)"""
-    topic_id = player['topic_id']
-    if topic_id.startswith('/m/') or topic_id.startswith('/g/'):
-        return topic_id
-    return player['player']['name']
+def record_api_call(duration: timedelta):
+    """Count an API call and its duration, safe to call from worker threads"""
+    global api_calls_counter
+    with api_calls_lock:
+        api_calls_counter += 1
+    timing_stats.add_api_call(duration)
 
 
-def wait_between_api_calls():
-    """Ensure minimum delay between API calls"""
-    global get_trends_data_last_call
-    time_since_last = time.time() - get_trends_data_last_call
-    if time_since_last < MIN_DELAY_BETWEEN_CALLS:
-        time.sleep(MIN_DELAY_BETWEEN_CALLS - time_since_last)
+def scores_from_interest(interest_data: pd.DataFrame, identifiers: List[str]) -> Dict[str, float]:
+    """Keep a response in the observation store and return its scores by identifier"""
+    payload_id = observations.add(interest_data, identifiers)
+    payload_scores = observations.payload_scores(payload_id, SCORING_METHOD)
+    return {identifier: round(payload_scores[identifier], 2) for identifier in identifiers}
 
 
-def get_trends_data(players_group: List[Dict], 
-                    progress: Optional[ProgressDisplay] = None) -> Dict[str, float]:
-    """Query Google Trends for a group of players"""
-    global api_calls_counter, get_trends_data_last_call, timing_stats
-    
-    # Ensure minimum delay between API calls
-    wait_between_api_calls()
-    
-    # Map players to their identifiers
-    player_identifiers = {get_player_identifier(player): player for player in players_group}
-    search_names = list(player_identifiers.keys())
+def get_trends_data(players_group: List[PlayerRecord],
+                    progress: Optional[ProgressDisplay] = None,
+                    step: Optional[str] = None) -> Dict[str, float]:
+    """Get scores for a group of players, journaling them under step for resuming"""
+    if step is None:
+        return query_trends_data(players_group, progress)
+
+    members = [player.identifier for player in players_group]
+    scores = run_journal.lookup(step, members)
+    if scores is None:
+        scores = query_trends_data(players_group, progress)
+        run_journal.record(step, members, scores)
+    else:
+        # Keep the global ranking complete when the response is still cached;
+        # a peek, since replaying the journal saved a call either way
+        cached = trends_cache.peek(make_cache_key(members, TIMEFRAME, GEO))
+        if cached is not None:
+            observations.add(cached, members)
+    return scores
+
+
+def query_trends_data(players_group: List[PlayerRecord], 
+                      progress: Optional[ProgressDisplay] = None) -> Dict[str, float]:
+    """Query Google Trends for a group of players.
+
+    Responses are served from the Trends cache when the same set of players was
+    already queried in this scheduling window. Otherwise each attempt runs on
+    whichever proxy worker is ready first, so a retry after an empty response or a
+    429 moves to another proxy while the failing one cools down.
+    """
+    # Players are unique by identifier, so every keyword is a distinct topic
+    search_names = [player.identifier for player in players_group]
+
+    cache_key = make_cache_key(search_names, TIMEFRAME, GEO)
+    cached = trends_cache.get(cache_key)
+    if cached is not None:
+        return scores_from_interest(cached, search_names)
     
-    # Create mapping of topic IDs to player names for display
-    player_names = {player['topic_id']: player['player']['name'] for player in players_group}
+    # Create mapping of identifiers to player names for display
+    player_names = {player.identifier: player.name for player in players_group}
     
     # Display players in the current group
     if progress and players_group:
-        names_list = [p['player']['name'] for p in players_group]
+        names_list = [p.name for p in players_group]
         progress.set_message(f"Group: {' | '.join(names_list)}")
     
     # Try to get data with retries
     for no_data_attempt in range(MAX_NO_DATA_RETRIES + 1):
-        try:
-            # Record API call timing
-            call_start = datetime.now()
-            time.sleep(MIN_DELAY_BETWEEN_CALLS)  # Add delay before API call
-            
-            # Make the API call
-            pytrends.build_payload(
-                search_names,
-                timeframe='now 1-d',
-                geo='',
-                gprop=''
-            )
-            
-            # Update counters and timing
-            api_calls_counter += 1
-            get_trends_data_last_call = time.time()
-            interest_data = pytrends.interest_over_time()
-            call_duration = datetime.now() - call_start
-            timing_stats.add_api_call(call_duration)
-            
-            if progress:
-                progress.set_api_call_time(call_duration)
-            
-            # Handle empty response
-            if interest_data.empty:
-                if no_data_attempt < MAX_NO_DATA_RETRIES:
-                    delay = RETRY_DELAYS[no_data_attempt]
-                    if progress:
-                        names = [player_names.get(topic_id, topic_id) for topic_id in search_names]
-                        progress.set_message(
-                            f"No data received (attempt {no_data_attempt + 1}/{MAX_NO_DATA_RETRIES + 1}), "
-                            f"retrying in {delay}s for: {', '.join(names)}",
-                            status="warning"
-                        )
-                    time.sleep(delay)
-                    continue
-                else:
-                    if progress:
-                        names = [player_names.get(topic_id, topic_id) for topic_id in search_names]
-                        progress.set_message(
-                            f"No data after {MAX_NO_DATA_RETRIES + 1} attempts for: {', '.join(names)}",
-                            status="error"
-                        )
-                    return {player['player']['name']: 0 for player in players_group}
-            
-            if progress:
-                progress.clear_message()
-            
-            # Map scores back to original player names
-            results = {}
-            for search_name, player in player_identifiers.items():
-                original_name = player['player']['name']
-                score = round(interest_data[search_name].max(), 2)
-                
-                # If we already have a score for this player, take the higher one
-                if original_name in results:
-                    results[original_name] = max(results[original_name], score)
-                else:
-                    results[original_name] = score
-            
-            return results
-            
-        except Exception as e:
-            # Handle rate limiting errors
-            is_rate_limit = "429" in str(e)
-            
-            if no_data_attempt < MAX_NO_DATA_RETRIES:
-                # Determine retry delay
-                delay = RATE_LIMIT_PAUSE if is_rate_limit else RETRY_DELAYS[no_data_attempt]
-                
+        with trends_pool.worker() as worker:
+            try:
+                # Respect this proxy's pacing and any cooldown
+                worker.wait()
+                call_start = datetime.now()
+
+                # Make the API call
+                worker.client.build_payload(
+                    search_names,
+                    timeframe=TIMEFRAME,
+                    geo=GEO,
+                    gprop=''
+                )
+
+                # Update counters and timing
+                worker.mark_call()
+                interest_data = worker.client.interest_over_time()
+                call_duration = datetime.now() - call_start
+                record_api_call(call_duration)
+                worker.mark_success()
+
                 if progress:
-                    error_msg = (
-                        f"Rate limit hit, pausing for {delay}s before retry" 
-                        if is_rate_limit else
-                        f"Error occurred (attempt {no_data_attempt + 1}/{MAX_NO_DATA_RETRIES + 1}): {str(e)}, retrying in {delay}s"
-                    )
-                    progress.set_message(error_msg, status="warning")
-                
-                time.sleep(delay)
-                continue
-            
-            # All retries failed
-            error_msg = "Failed due to rate limiting (HTTP 429)" if is_rate_limit else f"All retries failed for group: {str(e)}"
-            log_message(f"\n{error_msg}", Colors.RED)
-            log_message(f"Failed players: {', '.join(search_names)}", Colors.RED)
-            log_message("Stopping script due to repeated failures", Colors.RED)
-            exit(1)
+                    progress.set_api_call_time(call_duration)
 
+                # Handle empty response
+                if interest_data.empty:
+                    if no_data_attempt < MAX_NO_DATA_RETRIES:
+                        delay = RETRY_DELAYS[no_data_attempt]
+                        if progress:
+                            names = [player_names.get(topic_id, topic_id) for topic_id in search_names]
+                            progress.set_message(
+                                f"No data received (attempt {no_data_attempt + 1}/{MAX_NO_DATA_RETRIES + 1}), "
+                                f"retrying in {delay}s for: {', '.join(names)}",
+                                status="warning"
+                            )
+                        worker.cool_down(delay)
+                        continue
+                    else:
+                        if progress:
+                            names = [player_names.get(topic_id, topic_id) for topic_id in search_names]
+                            progress.set_message(
+                                f"No data after {MAX_NO_DATA_RETRIES + 1} attempts for: {', '.join(names)}",
+                                status="error"
+                            )
+                        return {identifier: 0 for identifier in search_names}
 
-def is_active_player(player: Dict) -> bool:
-    """Determine if a player is active based on game appearances or bench time"""
-    games = player['statistics'][0]['games']
-    has_appearances = games['appearences'] is not None and games['appearences'] > 0
-    
-    substitutes = player['statistics'][0]['substitutes']
-    on_bench = substitutes['bench'] is not None and substitutes['bench'] > 0
-    
-    return has_appearances or on_bench
+                if progress:
+                    progress.clear_message()
+
+                trends_cache.put(cache_key, interest_data)
+                return scores_from_interest(interest_data, search_names)
 
+            except Exception as e:
+                # Handle rate limiting errors
+                is_rate_limit = "429" in str(e)
+                if not is_rate_limit:
+                    worker.mark_failure()
 
-def filter_active_players(players: List[Dict]) -> List[Dict]:
-    """Filter to get only active players"""
-    return [player for player in players if is_active_player(player)]
+                if no_data_attempt < MAX_NO_DATA_RETRIES:
+                    # Determine retry delay
+                    delay = RATE_LIMIT_PAUSE if is_rate_limit else RETRY_DELAYS[no_data_attempt]
 
+                    if progress:
+                        error_msg = (
+                            f"Rate limit hit on {worker.label}, pausing it for {delay}s before retry"
+                            if is_rate_limit else
+                            f"Error occurred (attempt {no_data_attempt + 1}/{MAX_NO_DATA_RETRIES + 1}): {str(e)}, retrying in {delay}s"
+                        )
+                        progress.set_message(error_msg, status="warning")
 
-def run_tournament_round(players: List[Dict], 
+                    worker.cool_down(delay)
+                    continue
+
+                # All retries failed
+                error_msg = "Failed due to rate limiting (HTTP 429)" if is_rate_limit else f"All retries failed for group: {str(e)}"
+                log_message(f"\n{error_msg}", Colors.RED)
+                log_message(f"Failed players: {', '.join(search_names)}", Colors.RED)
+                log_message("Stopping script due to repeated failures", Colors.RED)
+                exit(1)
+
+
+def run_tournament_round(players: List[PlayerRecord], 
                          players_to_keep: int = 2,
-                         round_num: int = 1) -> List[Dict]:
+                         round_num: int = 1) -> List[PlayerRecord]:
     """Run one round of the tournament"""
     results = []
     total_groups = (len(players) + 4) // 5
@@ -304,18 +342,26 @@ def run_tournament_round(players: List[Dict],
     progress = ProgressDisplay(total_groups, desc=f"Round {round_num}")
     progress.start()
     
-    for i in range(0, len(players), 5):
-        group = players[i:min(i+5, len(players))]
-        if len(group) < 2:  # Skip groups that are too small
+    # Groups are independent, so they are queried concurrently across proxies
+    groups = [players[i:min(i+5, len(players))] for i in range(0, len(players), 5)]
+    queried = [(num, group) for num, group in enumerate(groups, 1)
+               if len(group) >= 2]  # Skip groups that are too small
+    group_scores = trends_pool.imap(
+        lambda item: get_trends_data(item[1], progress, step=f"round{round_num}-group{item[0]}"),
+        queried
+    )
+    
+    for i, group in zip(range(0, len(players), 5), groups):
+        if len(group) < 2:
             results.extend(group)
             continue
         
         # Get scores for this group
-        scores = get_trends_data(group, progress)
+        scores = next(group_scores)
         
         # Sort players by score and get winners
-        sorted_group = sorted(group, key=lambda p: scores.get(p['player']['name'], 0), reverse=True)
-        winners = [p['player']['name'] for p in sorted_group[:players_to_keep]]
+        sorted_group = sorted(group, key=lambda p: scores.get(p.identifier, 0), reverse=True)
+        winners = [p.identifier for p in sorted_group[:players_to_keep]]
         
         # Show group results
         group_num = (i + 5) // 5
@@ -326,51 +372,40 @@ def run_tournament_round(players: List[Dict],
         progress.update(group_num)
     
     progress.finish()
-    
-    # Deduplicate players by name, keeping highest score
-    seen_players = {}
-    for player in results:
-        name = player['player']['name']
-        if name not in seen_players:
-            seen_players[name] = player
-    
-    return list(seen_players.values())
+    return results
 
 
-def get_detailed_interest_data(players: List[Dict]) -> Dict[str, Dict]:
-    """Get detailed interest over time data for players"""
+def get_detailed_interest_data(players: List[PlayerRecord]) -> Dict[str, Dict]:
+    """Get detailed interest over time data for players from stored observations"""
     try:
         # Use appropriate identifiers for the players
-        player_identifiers = [get_player_identifier(player) for player in players]
-        
-        # Log what we're fetching
-        log_message(f"Fetching interest over time for topics: {player_identifiers}", Colors.BLUE)
+        player_identifiers = [player.identifier for player in players]
         
-        # Make API call
-        pytrends.build_payload(
-            player_identifiers,
-            timeframe='now 1-d',
-            geo='',
-            gprop=''
-        )
+        # The final comparison is normally already stored; a journal replay is not
+        payload_id = observations.find_payload(player_identifiers)
+        if payload_id is None:
+            log_message(f"Fetching interest over time for topics: {player_identifiers}", Colors.BLUE)
+            get_trends_data(players)
+            payload_id = observations.find_payload(player_identifiers)
+        if payload_id is None:
+            log_message("Warning: No interest data available for final group", Colors.YELLOW)
+            return {}
         
-        interest_data = pytrends.interest_over_time()
-        log_message(f"Got interest data with columns: {interest_data.columns}", Colors.BLUE)
-        
-        # Convert to dictionary with player names as keys
+        # Convert to dictionary with player identifiers as keys
         result = {}
-        player_map = {get_player_identifier(player): player for player in players}
+        series = observations.series(payload_id)
+        player_map = {player.identifier: player for player in players}
         
         for topic_id, player in player_map.items():
-            player_name = player['player']['name']
+            player_name = player.name
             
-            if topic_id in interest_data:
+            if topic_id in series:
                 # Convert values to native Python types
-                values = [float(x) for x in interest_data[topic_id].values]
-                dates = [d.strftime('%Y-%m-%d %H:%M:%S') for d in interest_data.index]
+                stamps, values = series[topic_id]
+                dates = [str(ts).replace('T', ' ') for ts in stamps]
                 
-                result[player_name] = {
-                    "values": values,
+                result[topic_id] = {
+                    "values": [float(x) for x in values],
                     "dates": dates
                 }
                 
@@ -384,76 +419,123 @@ def get_detailed_interest_data(players: List[Dict]) -> Dict[str, Dict]:
         return {}
 
 
-def run_knockout_phase(top_4: List[Dict], challengers: List[Dict]) -> Tuple[Dict, float]:
-    """Run the knockout phase to find the best 5th player"""
+def get_final_round_bounds(leader: PlayerRecord) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Log-ratio bounds of every observed player against the top 4 leader"""
+    return observations.ratio_bounds(leader.identifier, SCORING_METHOD, BOUND_SLACK)
+
+
+def run_knockout_phase(top_4: List[PlayerRecord], challengers: List[PlayerRecord]) -> List[PlayerRecord]:
+    """Run the knockout phase to settle the top 4.
+
+    A challenger whose upper bound from earlier comparisons is below the lower
+    bound of the current 4th place cannot enter the top 4 and is skipped.
+    """
     progress = ProgressDisplay(len(challengers), desc="Processing challengers")
     progress.start()
     
     current_group = top_4.copy()
-    best_fifth = None
-    best_fifth_score = -1
+    skipped = 0
     
     for i, challenger in enumerate(challengers):
+        lower, upper = get_final_round_bounds(current_group[0])
+        if (upper.get(challenger.identifier, math.inf)
+                < lower.get(current_group[3].identifier, -math.inf)):
+            skipped += 1
+            progress.update(i+1)
+            continue
+        
         # Compare top 4 against this challenger
         comparison_group = current_group + [challenger]
-        scores = get_trends_data(comparison_group, progress)
+        scores = get_trends_data(comparison_group, progress, step=f"knockout-{i + 1}")
         
         # Sort based on this comparison
-        comparison_group.sort(key=lambda p: scores.get(p['player']['name'], 0), reverse=True)
+        comparison_group.sort(key=lambda p: scores.get(p.identifier, 0), reverse=True)
+        winners = [p.identifier for p in comparison_group[:4]]
         
         # Check if challenger made it into top 4
-        if challenger in comparison_group[:4]:
+        if challenger.identifier in winners:
             # Challenger succeeded, update current top 4
             current_group = comparison_group[:4]
-        else:
-            # Challenger failed, check if they're better than current best 5th
-            challenger_score = scores.get(challenger['player']['name'], 0)
-            if challenger_score > best_fifth_score:
-                best_fifth = challenger
-                best_fifth_score = challenger_score
-                log_message(f"\nNew best 5th: {challenger['player']['name']} ({challenger_score})", Colors.GREEN)
         
         # Show current standings
-        winners = [p['player']['name'] for p in comparison_group[:4]]
         progress.show_group_result(i+1, comparison_group, scores, winners)
         progress.update(i+1)
     
     progress.finish()
-    return best_fifth, best_fifth_score
+    if skipped:
+        log_message(f"Skipped {skipped} challengers that could not reach the top 4", Colors.BLUE)
+    return current_group
 
 
-def find_best_fifth(top_4: List[Dict], remaining_players: List[Dict]) -> Tuple[Dict, float]:
-    """Find the best 5th place player from all remaining players"""
+def find_best_fifth(top_4: List[PlayerRecord], remaining_players: List[PlayerRecord]) -> Tuple[PlayerRecord, float]:
+    """Find the best 5th place player from all remaining players.
+
+    Scores are kept relative to the top 4 leader, so every comparison lands on one
+    scale. Challengers are tested strongest upper bound first, and stop being
+    tested once no remaining upper bound can beat the best 5th. Challengers that
+    are certainly weaker than the leader are batched 4 at a time into a payload
+    with just the leader, which gives the same scale as testing them against the
+    whole top 4.
+    """
     log_message("\nFinding best 5th place from all remaining players...", Colors.BLUE)
     progress = ProgressDisplay(len(remaining_players), desc="Testing for 5th place")
     progress.start()
     
+    leader = top_4[0]
+    leader_id = leader.identifier
     best_fifth = None
     best_fifth_score = -1
+    pending = list(remaining_players)
+    calls = 0
     
-    # Test each remaining player against the top 4
-    for i, player in enumerate(remaining_players):
-        comparison_group = top_4 + [player]
-        scores = get_trends_data(comparison_group, progress)
-        player_score = scores.get(player['player']['name'], 0)
+    while pending:
+        lower, upper = get_final_round_bounds(leader)
         
-        if player_score > best_fifth_score:
-            best_fifth = player
-            best_fifth_score = player_score
-            log_message(f"\nNew best 5th: {player['player']['name']} ({player_score})", Colors.GREEN)
+        # Drop challengers that cannot beat the best 5th so far
+        if best_fifth:
+            floor = lower.get(best_fifth.identifier, -math.inf)
+            pending = [p for p in pending if upper.get(p.identifier, math.inf) >= floor]
+            if not pending:
+                break
+        pending.sort(key=lambda p: upper.get(p.identifier, math.inf), reverse=True)
+        
+        # Batch challengers that are certainly below the leader, test the rest alone
+        batch = [p for p in pending[:4] if upper.get(p.identifier, math.inf) < 0]
+        if batch:
+            comparison_group = [leader] + batch
+        else:
+            batch = pending[:1]
+            comparison_group = top_4 + batch
+        
+        calls += 1
+        scores = get_trends_data(comparison_group, progress, step=f"fifth-{calls}")
+        leader_score = scores.get(leader_id, 0)
+        
+        for player in batch:
+            player_score = scores.get(player.identifier, 0)
+            if leader_score:
+                player_score = round(100 * player_score / leader_score, 2)
+            
+            if player_score > best_fifth_score:
+                best_fifth = player
+                best_fifth_score = player_score
+                log_message(f"\nNew best 5th: {player.name} ({player_score})", Colors.GREEN)
         
         # Show result
-        winners = [p['player']['name'] for p in top_4]
-        progress.show_group_result(i+1, comparison_group, scores, winners)
-        progress.update(i+1)
+        winners = [p.identifier for p in top_4]
+        progress.show_group_result(calls, comparison_group, scores, winners)
+        tested = {p.identifier for p in batch}
+        pending = [p for p in pending if p.identifier not in tested]
+        progress.update(len(remaining_players) - len(pending))
     
     progress.update(len(remaining_players))
     progress.finish()
+    log_message(f"Tested {len(remaining_players)} candidates for 5th place with {calls} calls", Colors.BLUE)
     
     return best_fifth, best_fifth_score
 
 
-def run_final_round(players: List[Dict]) -> Tuple[List[Dict], Dict[str, float]]:
+def run_final_round(players: List[PlayerRecord]) -> Tuple[List[PlayerRecord], Dict[str, float]]:
     """Run final round as a knockout system"""
     log_message("\n=== Final Round ===", Colors.GREEN)
     log_message(f"Starting final round with {len(players)} players", Colors.BLUE)
@@ -463,54 +545,452 @@ def run_final_round(players: List[Dict]) -> Tuple[List[Dict], Dict[str, float]]:
     challengers = players[5:]
     
     # Get initial scores and sort initial group
-    initial_scores = get_trends_data(current_group)
-    current_group.sort(key=lambda p: initial_scores.get(p['player']['name'], 0), reverse=True)
+    initial_scores = get_trends_data(current_group, step="final-initial")
+    current_group.sort(key=lambda p: initial_scores.get(p.identifier, 0), reverse=True)
     
     # Show initial top 5
     log_message("\nInitial Top 5:", Colors.BLUE)
     for i, player in enumerate(current_group, 1):
-        name = player['player']['name']
-        score = initial_scores.get(name, 0)
+        score = initial_scores.get(player.identifier, 0)
         log_message(format_player_name_with_score(player, score, prefix=f"{i}. "), Colors.BLUE)
     
     # Process challengers to find top 4
-    best_fifth, _ = run_knockout_phase(current_group[:4], challengers)
-    top_4 = current_group[:4]
+    top_4 = run_knockout_phase(current_group[:4], challengers)
     
     # Find best 5th from all remaining players
-    remaining_players = [p for p in players if p not in top_4]
+    top_4_ids = {p.identifier for p in top_4}
+    remaining_players = [p for p in players if p.identifier not in top_4_ids]
     best_fifth, _ = find_best_fifth(top_4, remaining_players)
     
     # Final comparison of top 4 plus best 5th place
     final_group = top_4 + [best_fifth]
-    final_scores = get_trends_data(final_group)
-    final_group.sort(key=lambda p: final_scores.get(p['player']['name'], 0), reverse=True)
-    
-    # Get detailed data for the final top 5
-    log_message("\nGetting detailed data for final top 5...", Colors.BLUE)
-    detailed_data = get_detailed_interest_data(final_group[:5])
-    
-    # Save results
-    save_results(final_group[:5], final_scores, interest_data=detailed_data)
+    final_scores = get_trends_data(final_group, step="final")
+    final_group.sort(key=lambda p: final_scores.get(p.identifier, 0), reverse=True)
     
     return final_group, final_scores
 
 
-def save_results(top_5: List[Dict], scores: Dict[str, float], 
+def choose_base_anchor(players: List[PlayerRecord]) -> PlayerRecord:
+    """Pick the base rung of the anchor ladder.
+
+    The strongest of 5 random players (the list is shuffled) sits around the top
+    fifth of the roster: strong enough that few players swamp it, weak enough that
+    few round to 0 against it. Picking it costs one call.
+    """
+    sample = players[:5]
+    scores = get_trends_data(sample, step="anchor-base")
+    return max(sample, key=lambda p: scores.get(p.identifier, 0))
+
+
+def pick_rung(candidates: Dict[str, float], target: float, stronger: bool,
+              current: float) -> Optional[str]:
+    """Pick the measured player closest to target, strictly beyond the current rung"""
+    if stronger:
+        eligible = {n: s for n, s in candidates.items() if s > current}
+    else:
+        eligible = {n: s for n, s in candidates.items() if 0 < s < current}
+    if not eligible:
+        return None
+    return min(eligible, key=lambda n: abs(math.log(eligible[n] / target)))
+
+
+def score_against_rung(players: List[PlayerRecord], rung: PlayerRecord, rung_score: float,
+                       desc: str) -> Tuple[Dict[str, float], Dict[str, float], List[PlayerRecord], List[PlayerRecord]]:
+    """Score players in payloads of 4 plus the rung player.
+
+    Returns (scores precise enough to keep, coarse scores for the rest, players that
+    rounded to 0 against this rung, players that pushed this rung below the signal
+    floor). All scores are on the
+    ladder scale, where the rung player scores rung_score.
+
+    A payload that comes back without data (every value 0) says nothing about its
+    players, so they are regrouped and queried again, and left out of all four
+    results if that keeps failing.
+    """
+    rung_id = rung.identifier
+    measured = {}
+    coarse = {}
+    too_weak = []
+    too_strong = []
+    pending = players
+
+    for attempt in range(ANCHOR_EMPTY_REQUERIES + 1):
+        if attempt:
+            log_message(f"\n{len(pending)} players got no data against {rung.name}, "
+                        f"querying them again", Colors.YELLOW)
+        pass_desc = f"{desc} retry {attempt}" if attempt else desc
+        groups = [pending[i:i + 4] for i in range(0, len(pending), 4)]
+        no_data = []
+
+        progress = ProgressDisplay(len(groups), desc=pass_desc)
+        progress.start()
+
+        group_scores = trends_pool.imap(
+            lambda item: get_trends_data([rung] + item[1], progress, step=f"{pass_desc}-{item[0]}"),
+            enumerate(groups, 1)
+        )
+
+        for group_num, (group, scores) in enumerate(zip(groups, group_scores), 1):
+            rung_value = scores.get(rung_id, 0)
+
+            if rung_value == 0 and not any(scores.get(p.identifier, 0) for p in group):
+                no_data.extend(group)
+            else:
+                for player in group:
+                    identifier = player.identifier
+                    value = scores.get(identifier, 0)
+                    if rung_value > 0:
+                        coarse[identifier] = rung_score * value / rung_value
+                    if rung_value < ANCHOR_MIN_SIGNAL:
+                        too_strong.append(player)
+                    elif value == 0:
+                        too_weak.append(player)
+                    else:
+                        measured[identifier] = coarse[identifier]
+
+            winners = [p.identifier for p in group if p.identifier in measured]
+            progress.show_group_result(group_num, [rung] + group, scores, winners)
+            progress.update(group_num)
+
+        progress.finish()
+        # Regroup, so players that keep coming back empty together are split up
+        pending = no_data[1::2] + no_data[::2]
+        if not pending:
+            break
+
+    if pending:
+        log_message(f"{len(pending)} players got no data against {rung.name}, leaving them unscored",
+                    Colors.YELLOW)
+    return measured, coarse, too_weak, too_strong
+
+
+def run_anchor_scoring(players: List[PlayerRecord]) -> Dict[str, float]:
+    """Score every player on one common scale against a ladder of reference players.
+
+    Every payload holds a rung of the ladder plus 4 players, so a full pass costs
+    about N/4 calls. Players that round to 0 against a rung are scored against a
+    weaker rung instead of re-querying the same payload, and players that push the
+    rung to (near) 0 against a stronger one. Rungs are picked from players
+    already measured, so the ratio between rungs is known without extra calibration
+    calls. Scores are relative to the base anchor at 100.
+    """
+    base = choose_base_anchor(players)
+    base_id = base.identifier
+    log_message(f"Base anchor: {base.name}", Colors.BLUE)
+
+    scores = {base_id: 100.0}
+    by_identifier = {p.identifier: p for p in players}
+    others = [p for p in players if p.identifier != base_id]
+    measured, coarse, too_weak, too_strong = score_against_rung(others, base, 100.0, "Anchor pass")
+    scores.update(measured)
+
+    # Walk down the ladder for players that rounded to 0
+    rung_score = 100.0
+    for depth in range(1, ANCHOR_MAX_RUNGS + 1):
+        if not too_weak:
+            break
+        rung_id = pick_rung(scores, rung_score / ANCHOR_RUNG_STEP, stronger=False,
+                            current=rung_score)
+        if not rung_id:
+            break
+        rung_score = scores[rung_id]
+        log_message(f"\n{len(too_weak)} players rounded to 0, using weaker rung "
+                    f"{by_identifier[rung_id].name} ({rung_score:.2f})", Colors.BLUE)
+        measured, rung_coarse, too_weak, _ = score_against_rung(
+            too_weak, by_identifier[rung_id], rung_score, f"Weaker rung {depth}")
+        scores.update(measured)
+        coarse.update(rung_coarse)
+
+    # Walk up the ladder for players that swamped the rung
+    rung_score = 100.0
+    for depth in range(1, ANCHOR_MAX_RUNGS + 1):
+        if not too_strong:
+            break
+        rung_id = pick_rung(scores, rung_score * ANCHOR_RUNG_STEP, stronger=True,
+                            current=rung_score)
+        if not rung_id:
+            break
+        rung_score = scores[rung_id]
+        log_message(f"\n{len(too_strong)} players above signal, using stronger rung "
+                    f"{by_identifier[rung_id].name} ({rung_score:.2f})", Colors.BLUE)
+        measured, rung_coarse, _, too_strong = score_against_rung(
+            too_strong, by_identifier[rung_id], rung_score, f"Stronger rung {depth}")
+        scores.update(measured)
+        coarse.update(rung_coarse)
+
+    # Players left without a precise score keep their best coarse estimate;
+    # those never measured at all stay unscored and rank last
+    for identifier, score in coarse.items():
+        scores.setdefault(identifier, score)
+
+    unscored = sum(1 for p in players if p.identifier not in scores)
+    if unscored:
+        log_message(f"\n{unscored} players could not be scored against any rung", Colors.YELLOW)
+
+    return scores
+
+
+def run_anchor_mode(players: List[PlayerRecord]) -> Tuple[List[PlayerRecord], Dict[str, float]]:
+    """Rank players with anchor scoring, then settle the top with the final round"""
+    log_message("\n=== Anchor Scoring ===", Colors.BLUE)
+    scores = run_anchor_scoring(players)
+
+    ranked = sorted(players, key=lambda p: scores.get(p.identifier, 0), reverse=True)
+    log_message(f"\nTop {ANCHOR_FINALISTS} by anchor score:", Colors.BLUE)
+    for i, player in enumerate(ranked[:ANCHOR_FINALISTS], 1):
+        score = round(scores.get(player.identifier, 0), 2)
+        log_message(format_player_name_with_score(player, score, prefix=f"{i}. "), Colors.BLUE)
+
+    return run_final_round(ranked[:ANCHOR_FINALISTS])
+
+
+def query_groups(groups: List[List[PlayerRecord]], desc: str, step_prefix: str) -> None:
+    """Query independent groups across proxies; scores land in the observation store"""
+    progress = ProgressDisplay(len(groups), desc=desc)
+    progress.start()
+
+    group_scores = trends_pool.imap(
+        lambda item: get_trends_data(item[1], progress, step=f"{step_prefix}-{item[0]}"),
+        enumerate(groups, 1)
+    )
+    for group_num, (group, scores) in enumerate(zip(groups, group_scores), 1):
+        leader = max(group, key=lambda p: scores.get(p.identifier, 0))
+        progress.show_group_result(group_num, group, scores, [leader.identifier])
+        progress.update(group_num)
+
+    progress.finish()
+
+
+def plan_adaptive_payloads(inside: List[RankedPlayer], outside: List[RankedPlayer],
+                           unsettled_in: List[RankedPlayer], unsettled_out: List[RankedPlayer],
+                           count: int) -> List[List[str]]:
+    """Pick up to count new payloads that compare the top set boundary.
+
+    Each payload holds one uncertain top set player (or the K-th player when all
+    are settled) and the outsiders most likely to belong in the top set, topped
+    up with more uncertain top set players. A payload that was already queried
+    would return the same response, so it gets another player near the boundary.
+    """
+    boundary = inside[-1].log_score
+    near_boundary = sorted(inside + outside, key=lambda r: abs(r.log_score - boundary))
+    anchors = [r.identifier for r in unsettled_in]
+    challengers = [r.identifier for r in unsettled_out]
+    fillers = anchors + [r.identifier for r in near_boundary[:20]]
+    used: Set[str] = set()
+    payloads = []
+
+    for _ in range(count):
+        anchor = next((a for a in anchors if a not in used), inside[-1].identifier)
+        members = [anchor]
+        for identifier in challengers + fillers:
+            if identifier in used or identifier in members:
+                continue
+            members.append(identifier)
+            if len(members) == 5:
+                if observations.find_payload(members) is None:
+                    break
+                members.pop()
+
+        if len(members) < 2 or observations.find_payload(members) is not None:
+            break
+        used.update(members)
+        payloads.append(members)
+
+    return payloads
+
+
+def run_adaptive_mode(players: List[PlayerRecord]) -> Tuple[List[PlayerRecord], Dict[str, float]]:
+    """Rank players by sampling where the top set is still uncertain.
+
+    Every player is screened once in disjoint groups of 5. From then on the global
+    least-squares fit acts as a Thurstone model on log scores, giving each player
+    an estimate and a standard error against the top set boundary. Like LUCB top-K
+    identification, each batch compares the least certain top set players with the
+    outsiders most likely to belong in it, so calls only go where they can change
+    the top set. Outsiders not yet linked to the boundary are represented by the
+    strongest player they are linked to. Sampling stops when every top set player
+    is above the best outsider, and every outsider below the K-th player, with
+    ADAPTIVE_CONFIDENCE. The top 5 then meet in one final payload.
+    """
+    top_k = max(TOP_N, 5)
+    z = NormalDist().inv_cdf(ADAPTIVE_CONFIDENCE)
+    tolerance = math.log(ADAPTIVE_TOLERANCE)
+    by_identifier = {player.identifier: player for player in players}
+
+    log_message("\n=== Adaptive Screening ===", Colors.BLUE)
+    groups = [players[i:i + 5] for i in range(0, len(players), 5)]
+    if len(groups) > 1 and len(groups[-1]) < 2:
+        groups[-1] = groups[-1] + groups[0][:1]  # A lone player cannot be measured
+    query_groups(groups, "Screening", "adaptive-screen")
+
+    log_message(f"\n=== Adaptive Sampling (top {top_k}, {ADAPTIVE_CONFIDENCE:.0%} confidence) ===",
+                Colors.BLUE)
+    calls = 0
+    batch = 0
+    while True:
+        solution = solve_global_ranking(observations, SCORING_METHOD)
+        ranked = [r for r in solution.players if r.identifier in by_identifier]
+        if len(ranked) <= top_k:
+            break
+        inside, outside = ranked[:top_k], ranked[top_k:]
+        kth, first_out = inside[-1], outside[0]
+
+        std_vs_out = difference_std(observations, solution, first_out.identifier, SCORING_METHOD)
+        std_vs_kth = difference_std(observations, solution, kth.identifier, SCORING_METHOD)
+        lower = {r.identifier: r.log_score - first_out.log_score - z * std_vs_out[r.identifier]
+                 for r in inside}
+        upper = {r.identifier: r.log_score - kth.log_score + z * std_vs_kth[r.identifier]
+                 for r in outside}
+
+        # Unlinked outsiders only matter through the strongest player of their component
+        components = connected_components(observations)
+        linked = {components[kth.identifier]}
+        unsettled_out = []
+        for r in outside:
+            if math.isinf(upper[r.identifier]):
+                if components[r.identifier] in linked:
+                    continue
+                linked.add(components[r.identifier])
+            if upper[r.identifier] > tolerance:
+                unsettled_out.append(r)
+        unsettled_out.sort(key=lambda r: upper[r.identifier], reverse=True)
+        unsettled_in = sorted((r for r in inside if lower[r.identifier] < -tolerance),
+                              key=lambda r: lower[r.identifier])
+
+        if not unsettled_in and not unsettled_out:
+            log_message(f"Top {top_k} settled after {calls} adaptive calls", Colors.GREEN)
+            break
+        if calls >= ADAPTIVE_MAX_CALLS:
+            log_message(f"Adaptive call budget spent with {len(unsettled_in) + len(unsettled_out)} "
+                        f"players unsettled, using the current estimate", Colors.YELLOW)
+            break
+
+        payloads = plan_adaptive_payloads(inside, outside, unsettled_in, unsettled_out,
+                                          min(trends_pool.size, ADAPTIVE_MAX_CALLS - calls))
+        if not payloads:
+            log_message("No new comparisons left to make, using the current estimate", Colors.YELLOW)
+            break
+
+        batch += 1
+        query_groups([[by_identifier[i] for i in payload] for payload in payloads],
+                     f"Adaptive {batch} ({len(unsettled_in)} in, {len(unsettled_out)} out unsettled)",
+                     f"adaptive-{batch}")
+        calls += len(payloads)
+
+    final_group = [by_identifier[r.identifier] for r in ranked[:5]]
+    final_scores = get_trends_data(final_group, step="final")
+    final_group.sort(key=lambda p: final_scores.get(p.identifier, 0), reverse=True)
+    return final_group, final_scores
+
+
+def extend_with_global_ranking(final_group: List[PlayerRecord], final_scores: Dict[str, float],
+                               ranking: RankingSolution, players: List[PlayerRecord]
+                               ) -> Tuple[List[PlayerRecord], Dict[str, float], Dict[str, Dict]]:
+    """Pick the top TOP_N players and their interest over time.
+
+    The final round measured its 5 players side by side, so they keep their order
+    and scores. Places beyond 5 come from the global ranking, scored and charted on
+    the final payload's scale so all entries stay comparable. No calls are made.
+    """
+    top_players = final_group[:TOP_N]
+    scores = {p.identifier: final_scores[p.identifier] for p in top_players}
+
+    log_message(f"\nGetting detailed data for final top {len(top_players)}...", Colors.BLUE)
+    interest_data = get_detailed_interest_data(top_players)
+
+    final_payload = observations.find_payload([p.identifier for p in final_group])
+    if len(top_players) >= TOP_N or final_payload is None:
+        return top_players, scores, interest_data
+
+    by_identifier = {player.identifier: player for player in players}
+
+    for ranked in ranking.players:
+        if len(top_players) >= TOP_N:
+            break
+        player = by_identifier.get(ranked.identifier)
+        if player is None or ranked.identifier in scores:
+            continue
+
+        # Estimated places never overtake players measured side by side
+        score = min(ranking.score_in_payload(ranked, final_payload), min(scores.values()))
+        top_players.append(player)
+        scores[ranked.identifier] = round(score, 2)
+
+        series = rescaled_series(observations, ranking, ranked.identifier, final_payload)
+        if series is not None:
+            stamps, values = series
+            interest_data[ranked.identifier] = {
+                "values": [round(float(x), 2) for x in values],
+                "dates": [str(ts).replace('T', ' ') for ts in stamps]
+            }
+
+    return top_players, scores, interest_data
+
+
+def save_global_ranking(ranking: RankingSolution, players: List[PlayerRecord],
+                        reference: List[PlayerRecord]) -> None:
+    """Save the least-squares ranking of every observed player to JSON.
+
+    Scores are on the scale of the reference payload (normally the final round,
+    where the leader scores about 100). std is the standard error of the log score.
+    """
+    reference_payload = observations.find_payload([p.identifier for p in reference])
+    top_log_score = ranking.players[0].log_score if ranking.players else 0.0
+
+    by_identifier = {player.identifier: player for player in players}
+
+    entries = []
+    for ranked in ranking.players:
+        player = by_identifier.get(ranked.identifier)
+        if player is None:
+            continue
+        if reference_payload is not None:
+            score = ranking.score_in_payload(ranked, reference_payload)
+        else:
+            score = 100 * math.exp(ranked.log_score - top_log_score)
+        entries.append({
+            "rank": len(entries) + 1,
+            "name": player.name,
+            "player_id": player.player_id,
+            "topic_id": player.topic_id,
+            "score": round(score, 4),
+            "log_score": round(ranked.log_score, 4),
+            "std": round(ranked.std, 4),
+            "observations": ranked.observations
+        })
+
+    result = {
+        "updated_at": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+        "scoring_method": SCORING_METHOD,
+        "players": entries
+    }
+
+    directory = os.path.dirname(RANKING_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = RANKING_FILE + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, RANKING_FILE)
+        log_message(f"Saved global ranking of {len(entries)} players to {RANKING_FILE}", Colors.GREEN)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise e
+
+
+def save_results(top_players: List[PlayerRecord], scores: Dict[str, float], 
                  interest_data: Optional[Dict] = None) -> None:
     """Save the final results to JSON"""
     # Create output directory
     os.makedirs('public', exist_ok=True)
     
-    # Load preprocessed players to get full data
-    with open(INPUT_FILE, 'r') as f:
-        preprocessed_players = json.load(f)
-    
-    # Create lookup for preprocessed players
-    player_lookup = {p['player']['name']: p for p in preprocessed_players}
+    # Decode the full records of just the players being written
+    player_lookup = hydrate(player_store, PLAYER_DATASET, top_players)
     
     # Sort players by score
-    sorted_players = sorted(top_5, key=lambda p: scores[p['player']['name']], reverse=True)
+    sorted_players = sorted(top_players, key=lambda p: scores[p.identifier], reverse=True)
     
     # Prepare final data structure
     result = {
@@ -520,9 +1000,10 @@ def save_results(top_5: List[Dict], scores: Dict[str, float],
     
     # Add data for each player
     for rank, player in enumerate(sorted_players, 1):
-        player_name = player['player']['name']
-        player_data = player_lookup[player_name]
-        trending_score = float(scores[player_name])
+        player_name = player.name
+        identifier = player.identifier
+        player_data = player_lookup[identifier]
+        trending_score = float(scores[identifier])
         
         # Create player entry with base data
         player_entry = {
@@ -536,10 +1017,10 @@ def save_results(top_5: List[Dict], scores: Dict[str, float],
         }
         
         # Add interest over time data if available
-        if interest_data and player_name in interest_data:
-            player_entry["interest_over_time"] = interest_data[player_name]
+        if interest_data and identifier in interest_data:
+            player_entry["interest_over_time"] = interest_data[identifier]
             log_message(f"Added interest data to {player_name} entry with "
-                       f"{len(interest_data[player_name]['values'])} points", Colors.BLUE)
+                       f"{len(interest_data[identifier]['values'])} points", Colors.BLUE)
         
         result["players"].append(player_entry)
     
@@ -561,16 +1042,22 @@ def save_results(top_5: List[Dict], scores: Dict[str, float],
         raise e
 
 
-def load_players() -> List[Dict]:
-    """Load preprocessed players from file"""
-    with open(INPUT_FILE, 'r') as f:
-        return json.load(f)
+def load_players() -> List[PlayerRecord]:
+    """Load compact records of the preprocessed players, one per Trends topic"""
+    player_store.sync(PLAYER_DATASET, INPUT_FILE)
+    players = load_records(player_store, PLAYER_DATASET)
+    merged = sum(len(player.positions) - 1 for player in players)
+    if merged:
+        log_message(f"Merged {merged} duplicate records by topic", Colors.YELLOW)
+    return players
 
 
 def fetch_trending_footballers(test_limit: Optional[int] = None) -> None:
     """Main function to find trending footballers"""
     try:
         global api_calls_counter
+        if SCORING_METHOD not in SCORING_METHODS:
+            raise ValueError(f"Unknown SCORING_METHOD: {SCORING_METHOD}")
         api_calls_counter = 0
         timing_stats.start()
         
@@ -579,34 +1066,59 @@ def fetch_trending_footballers(test_limit: Optional[int] = None) -> None:
         log_message("\n=== Tournament Start ===", Colors.BLUE)
         log_message(f"Total active players: {len(active_players)}", Colors.BLUE)
         
-        # Handle test mode
-        if test_limit:
-            active_players = active_players[:test_limit]
-            log_message(f"TEST MODE: Limited to {test_limit} players\n", Colors.YELLOW)
+        # Resume an interrupted run in the same order, so journaled groups replay
+        signature = file_signature(INPUT_FILE)
+        # Every setting that changes the journaled scores or which groups are queried
+        journal_mode = (f"{RANKING_MODE}:{test_limit or 'all'}:{SCORING_METHOD}:top{TOP_N}:"
+                        f"{ADAPTIVE_CONFIDENCE}:{TIMEFRAME}:{GEO}")
+        resumed_order = run_journal.resume(signature, journal_mode)
+        
+        if resumed_order is not None:
+            active_players = [active_players[i] for i in resumed_order]
+            log_message(f"Resuming interrupted run from {run_journal.path}\n", Colors.YELLOW)
         else:
-            random.shuffle(active_players)
-            log_message("Randomly shuffled players for fair competition\n", Colors.BLUE)
+            # Handle test mode
+            if test_limit:
+                order = list(range(min(test_limit, len(active_players))))
+                log_message(f"TEST MODE: Limited to {test_limit} players\n", Colors.YELLOW)
+            else:
+                order = list(range(len(active_players)))
+                random.shuffle(order)
+                log_message("Randomly shuffled players for fair competition\n", Colors.BLUE)
+            active_players = [active_players[i] for i in order]
+            run_journal.start(signature, journal_mode, order)
 
-        # Run tournament rounds until we reach the threshold
-        current_players = active_players
-        round_num = 1
-        
-        while len(current_players) > TOURNAMENT_THRESHOLD:
-            log_message(f"\n=== Round {round_num} ===", Colors.BLUE)
-            log_message(f"Processing {len(current_players)} players in "
-                       f"{(len(current_players) + 4) // 5} groups", Colors.BLUE)
-            current_players = run_tournament_round(current_players, players_to_keep=2, round_num=round_num)
-            round_num += 1
+        if RANKING_MODE == 'anchor':
+            final_5, final_scores = run_anchor_mode(active_players)
+        elif RANKING_MODE == 'adaptive':
+            final_5, final_scores = run_adaptive_mode(active_players)
+        else:
+            # Run tournament rounds until we reach the threshold
+            current_players = active_players
+            round_num = 1
+
+            while len(current_players) > TOURNAMENT_THRESHOLD:
+                log_message(f"\n=== Round {round_num} ===", Colors.BLUE)
+                log_message(f"Processing {len(current_players)} players in "
+                           f"{(len(current_players) + 4) // 5} groups", Colors.BLUE)
+                current_players = run_tournament_round(current_players, players_to_keep=2, round_num=round_num)
+                round_num += 1
+
+            # Run final round with remaining players
+            final_5, final_scores = run_final_round(current_players)
 
-        # Run final round with remaining players
-        final_5, final_scores = run_final_round(current_players)
+        # Rank everyone observed on one scale from the responses already stored
+        ranking = solve_global_ranking(observations, SCORING_METHOD)
+        save_global_ranking(ranking, active_players, final_5)
+        top_players, top_scores, detailed_data = extend_with_global_ranking(
+            final_5, final_scores, ranking, active_players)
+        save_results(top_players, top_scores, interest_data=detailed_data)
         
         # Display final results
         log_message("\n=== Final Results ===", Colors.GREEN)
-        log_message("Top 5 Trending Footballers:", Colors.GREEN)
-        for i, player in enumerate(final_5, 1):
-            name = player['player']['name']
-            score = final_scores[name]
+        log_message(f"Top {len(top_players)} Trending Footballers:", Colors.GREEN)
+        for i, player in enumerate(top_players, 1):
+            score = top_scores[player.identifier]
             log_message(format_player_name_with_score(player, score, prefix=f"{i}. "), Colors.GREEN)
         
         # Show performance stats
@@ -616,8 +1128,13 @@ def fetch_trending_footballers(test_limit: Optional[int] = None) -> None:
         log_message("\n=== Performance Stats ===", Colors.YELLOW)
         log_message(f"Total time: {total_time.total_seconds():.1f}s", Colors.YELLOW)
         log_message(f"Total API calls: {api_calls_counter}", Colors.YELLOW)
+        cache_hits, cache_misses = trends_cache.stats()
+        log_message(f"Cache hits: {cache_hits}, misses: {cache_misses}", Colors.YELLOW)
         log_message(f"Average call time: {avg_call_time.total_seconds():.1f}s", Colors.YELLOW)
+        if run_journal.replayed:
+            log_message(f"Groups replayed from journal: {run_journal.replayed}", Colors.YELLOW)
         log_message("=== Tournament Complete ===\n", Colors.BLUE)
+        run_journal.clear()
         
     except Exception as e:
         log_message(f"Error: {str(e)}", Colors.RED)
@@ -0,0 +1,49 @@
+"""
+Trends Backend
+
+Single place where scripts get a Google Trends client. The default backend is
+pytrends' TrendReq; setting TRENDS_BACKEND=simulated swaps in a local simulator
+(see trends_simulator.py) so tournament, concurrency and retry behaviour can be
+load-tested without network access.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+TRENDS_BACKEND = os.environ.get('TRENDS_BACKEND', 'google')  # 'google' or 'simulated'
+
+
+class TrendsBackend(ABC):
+    """The subset of the pytrends TrendReq interface used by the scripts"""
+    @abstractmethod
+    def build_payload(self, kw_list: List[str], cat: int = 0, timeframe: str = 'today 5-y',
+                      geo: str = '', gprop: str = '') -> None:
+        ...
+
+    @abstractmethod
+    def interest_over_time(self) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def suggestions(self, keyword: str) -> List[Dict]:
+        ...
+
+
+def create_client(proxies: Optional[List[str]] = None, **options: Any) -> TrendsBackend:
+    """Create a Trends client that rotates over proxies (or uses none).
+
+    options are TrendReq keyword arguments such as hl, timeout or retries; the
+    simulator ignores the ones it has no use for.
+    """
+    if TRENDS_BACKEND == 'simulated':
+        from trends_simulator import SimulatedTrends, get_simulation
+        return SimulatedTrends(get_simulation(), proxies=proxies)
+
+    if TRENDS_BACKEND != 'google':
+        raise ValueError(f"Unknown TRENDS_BACKEND: {TRENDS_BACKEND}")
+
+    from pytrends.request import TrendReq
+    return TrendReq(proxies=proxies or [], **options)
@@ -0,0 +1,112 @@
+"""
+Trends Cache
+
+Disk-backed cache for Google Trends interest_over_time responses. Entries are
+keyed by the sorted set of payload identifiers plus timeframe, geo and a time
+bucket, so the same group queried twice in a run, or again by a restarted run,
+is served without touching the network. A TTL keeps scheduled runs on fresh data.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+CACHE_FILE = os.environ.get('TRENDS_CACHE_FILE', 'data/trends_cache.sqlite')
+CACHE_TTL = 6 * 3600  # Seconds a cached response stays valid
+CACHE_BUCKET_HOURS = 12  # Scheduled runs are 12 hours apart
+CACHE_BUCKET_OFFSET_HOURS = 11  # Align bucket starts with the 11:00/23:00 UTC runs
+
+
+def time_bucket(now: Optional[float] = None) -> int:
+    """Index of the scheduling window a timestamp falls into"""
+    now = time.time() if now is None else now
+    return int((now - CACHE_BUCKET_OFFSET_HOURS * 3600) // (CACHE_BUCKET_HOURS * 3600))
+
+
+def make_cache_key(identifiers: List[str], timeframe: str, geo: str,
+                   bucket: Optional[int] = None) -> str:
+    """Build a content key that does not depend on keyword order"""
+    bucket = time_bucket() if bucket is None else bucket
+    raw = '|'.join(sorted(identifiers)) + f'#{timeframe}#{geo}#{bucket}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class TrendsCache:
+    """SQLite-backed response cache with in-run memoization"""
+    def __init__(self, path: str = CACHE_FILE, ttl: float = CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return a copy of the cached response, or None if missing or expired"""
+        with self._lock:
+            data = self._load(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data.copy()
+
+    def peek(self, key: str) -> Optional[pd.DataFrame]:
+        """Like get, but not counted in the hit/miss stats, for lookups that
+        do not stand in for a Trends call"""
+        with self._lock:
+            data = self._load(key)
+            return None if data is None else data.copy()
+
+    def _load(self, key: str) -> Optional[pd.DataFrame]:
+        if key in self._memory:
+            return self._memory[key]
+
+        row = self._connect().execute(
+            "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if not row or time.time() - row[0] > self.ttl:
+            return None
+
+        data = pd.read_json(io.StringIO(row[1]), orient='split')
+        self._memory[key] = data
+        return data
+
+    def put(self, key: str, data: pd.DataFrame):
+        """Store a response; empty responses are never cached"""
+        if data.empty:
+            return
+        with self._lock:
+            self._memory[key] = data.copy()
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, created_at, payload) VALUES (?, ?, ?)",
+                (key, time.time(), data.to_json(orient='split', date_format='iso'))
+            )
+            conn.commit()
+
+    def stats(self) -> Tuple[int, int]:
+        return self.hits, self.misses
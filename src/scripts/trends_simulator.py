@@ -0,0 +1,266 @@
+"""
+Trends Simulator
+
+Local stand-in for Google Trends built on a synthetic player population. Every
+player gets a hidden popularity and a 24-hour interest curve (diurnal swing plus
+an optional news spike); payloads are normalised to 0-100 the way Google does,
+so the ground truth ranking is known. Latency, 429 responses and empty responses
+can be injected to exercise pacing and retry paths.
+
+Configured through environment variables when used via TRENDS_BACKEND=simulated:
+SIM_PLAYERS, SIM_SEED, SIM_LATENCY, SIM_RATE_LIMIT_RATE, SIM_EMPTY_RATE, SIM_NOISE.
+"""
+
+import hashlib
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from pytrends.exceptions import TooManyRequestsError
+
+from trends_backend import TrendsBackend
+
+POINTS_PER_DAY = 180  # 'now 1-d' returns one point every 8 minutes
+LEAGUES = {
+    39: ('Premier League', 'England'),
+    140: ('La Liga', 'Spain'),
+    78: ('Bundesliga', 'Germany'),
+    135: ('Serie A', 'Italy'),
+    61: ('Ligue 1', 'France'),
+}
+TEAMS_PER_LEAGUE = 20
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Attacker']
+FIRST_NAMES = [
+    'James', 'Joshua', 'Benjamin', 'Matthew', 'Thomas', 'Daniel', 'Alexander', 'William',
+    'Pablo', 'José', 'Francisco', 'Santiago', 'Javier', 'Rodrigo', 'Sergio', 'Iñaki',
+    'Lukas', 'Jonas', 'Maximilian', 'Florian', 'Jürgen', 'Søren', 'Mikkel', 'Martin',
+    'Marco', 'Lorenzo', 'Federico', 'Nicolò', 'Giovanni', 'Kylian', 'Théo', 'Ousmane',
+    'Mohamed', 'Youssef', 'Kai', 'Jamal', 'Bukayo', 'Declan', 'Cole', 'Joško',
+]
+SURNAME_PARTS = [
+    'ro', 'dri', 'go', 'mar', 'tin', 'ez', 'gar', 'cía', 'fer', 'nan', 'dez', 'mül', 'ler',
+    'sch', 'mid', 'bec', 'ker', 'ros', 'si', 'bel', 'lin', 'gham', 'sa', 'ka', 'son', 'sen',
+    'kov', 'ić', 'va', 'lé', 'dem', 'bé', 'lé', 'mba', 'ppé', 'ha', 'land', 'ver', 'tz',
+]
+
+
+def make_player(seed: int, i: int) -> Dict:
+    """Synthetic API-Football record of player i, with its Trends topic"""
+    r = random.Random(seed * 1_000_003 + i)
+    firstname = r.choice(FIRST_NAMES)
+    if r.random() < 0.3:
+        firstname += ' ' + r.choice(FIRST_NAMES)
+    surname = ''.join(r.choice(SURNAME_PARTS) for _ in range(r.randint(2, 3))).capitalize()
+    lastname = surname
+    if r.random() < 0.2:
+        lastname += ' ' + ''.join(r.choice(SURNAME_PARTS) for _ in range(2)).capitalize()
+
+    # API-Football display names are usually initial + surname, sometimes one word
+    shape = r.random()
+    if shape < 0.6:
+        name = f"{firstname[0]}. {lastname}"
+    elif shape < 0.75:
+        name = surname
+    else:
+        name = f"{firstname.split()[0]} {lastname}"
+
+    league_id = r.choice(list(LEAGUES))
+    league_name, country = LEAGUES[league_id]
+    team_number = r.randrange(TEAMS_PER_LEAGUE)
+    team_id = league_id * 100 + team_number
+    active = r.random() < 0.85
+    appearances = r.randint(1, 30) if active else 0
+
+    return {
+        'player': {
+            'id': 1_000_000 + i,
+            'name': name,
+            'firstname': firstname,
+            'lastname': lastname,
+            'age': r.randint(17, 38),
+            'nationality': country,
+            'photo': f"https://media.api-sports.io/football/players/{1_000_000 + i}.png",
+        },
+        'statistics': [{
+            'team': {'id': team_id, 'name': f"{league_name.split()[0]} Club {team_number + 1}",
+                     'logo': f"https://media.api-sports.io/football/teams/{team_id}.png"},
+            'league': {'id': league_id, 'name': league_name, 'country': country, 'season': 2024},
+            'games': {'appearences': appearances, 'lineups': appearances // 2,
+                      'position': r.choice(POSITIONS)},
+            'substitutes': {'in': 0, 'out': 0, 'bench': r.randint(0, 5) if active else 0},
+        }],
+        'topic_id': f"/g/sim{i:07d}",
+        'topic_title': f"{firstname.split()[0]} {lastname}",
+        'topic_type': 'Footballer',
+    }
+
+
+def iter_players(size: int, seed: int = 42) -> Iterator[Dict]:
+    """The players of a population, generated one at a time"""
+    for i in range(size):
+        yield make_player(seed, i)
+
+
+class SyntheticPopulation:
+    """A roster of synthetic players with hidden, known popularity"""
+    def __init__(self, size: int = 2500, seed: int = 42, noise: float = 0.05,
+                 latency: float = 0.0, rate_limit_rate: float = 0.0, empty_rate: float = 0.0,
+                 resolvable_rate: float = 0.9):
+        self.size = size
+        self.seed = seed
+        self.noise = noise
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.empty_rate = empty_rate
+        self.calls = 0
+        self.rate_limited = 0
+        self.empty = 0
+        self.suggestion_calls = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+        end = datetime.now(timezone.utc).replace(second=0, microsecond=0, tzinfo=None)
+        self.index = pd.date_range(end=end, periods=POINTS_PER_DAY, freq='8min', name='date')
+
+        rng = np.random.default_rng(seed)
+        self.base = rng.lognormal(mean=0.0, sigma=1.6, size=size)
+        self.spike_height = np.where(rng.random(size) < 0.1, rng.gamma(2.0, 2.0, size), 0.0)
+        self.spike_center = rng.uniform(0, POINTS_PER_DAY, size)
+        self.spike_width = rng.uniform(3, 20, size)
+        self.phase = rng.uniform(0, 2 * np.pi, size)
+        self.resolvable = rng.random(size) < resolvable_rate
+        self.peaks = np.concatenate([
+            self.curves(np.arange(start, min(start + 10000, size))).max(axis=1)
+            for start in range(0, size, 10000)
+        ]) if size else np.zeros(0)
+
+        self.players = [make_player(seed, i) for i in range(size)]
+        self.by_topic = {player['topic_id']: i for i, player in enumerate(self.players)}
+        self._by_name: Dict[str, List[int]] = {}
+        for i, player in enumerate(self.players):
+            info = player['player']
+            for name in {info['name'], f"{info['firstname']} {info['lastname']}"}:
+                self._by_name.setdefault(name.lower(), []).append(i)
+
+    def curves(self, indices: np.ndarray) -> np.ndarray:
+        """Noise-free interest curves, one row per player"""
+        t = np.arange(POINTS_PER_DAY)[None, :]
+        diurnal = 1 + 0.3 * np.sin(2 * np.pi * t / POINTS_PER_DAY + self.phase[indices, None])
+        spike = 1 + self.spike_height[indices, None] * np.exp(
+            -((t - self.spike_center[indices, None]) / self.spike_width[indices, None]) ** 2)
+        return self.base[indices, None] * diurnal * spike
+
+    def ground_truth(self, k: int = 5) -> List[str]:
+        """Topic IDs of the k players with the highest true peak interest"""
+        return [self.players[i]['topic_id'] for i in np.argsort(-self.peaks)[:k]]
+
+    def interest(self, keywords: List[str]) -> pd.DataFrame:
+        """Interest over time for a payload, normalised so its overall peak is 100"""
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                raise TooManyRequestsError(
+                    'The request failed: Google returned a response with code 429', None)
+            if roll < self.rate_limit_rate + self.empty_rate:
+                self.empty += 1
+                return pd.DataFrame()
+
+        indices = np.array([self.by_topic.get(k, -1) for k in keywords])
+        values = np.zeros((len(keywords), POINTS_PER_DAY))
+        known = indices >= 0
+        if known.any():
+            values[known] = self.curves(indices[known])
+
+        # Same payload, same sampling noise, like repeated queries within a short window
+        digest = hashlib.sha1('|'.join(sorted(keywords)).encode('utf-8')).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8], 'little') ^ self.seed)
+        values *= rng.lognormal(0.0, self.noise, values.shape)
+
+        peak = values.max()
+        scaled = np.rint(values / peak * 100).astype(int) if peak > 0 else values.astype(int)
+        data = pd.DataFrame(scaled.T, index=self.index, columns=keywords)
+        data['isPartial'] = False
+        data.iloc[-1, data.columns.get_loc('isPartial')] = True
+        return data
+
+    def suggestions(self, keyword: str) -> List[Dict]:
+        """Topic suggestions for a search term, mimicking Trends autocomplete"""
+        with self._lock:
+            self.suggestion_calls += 1
+        words = [w for w in keyword.split() if w.lower() != 'footballer']
+        results = []
+        # Strip a trailing team name by trying successively shorter prefixes
+        for end in range(len(words), 0, -1):
+            matches = self._by_name.get(' '.join(words[:end]).lower())
+            if matches:
+                for i in matches[:3]:
+                    player = self.players[i]
+                    if self.resolvable[i]:
+                        results.append({'mid': player['topic_id'], 'title': player['topic_title'],
+                                         'type': 'Footballer'})
+                    else:
+                        results.append({'mid': f"/m/decoy{i}", 'title': player['topic_title'],
+                                        'type': 'Former footballer'})
+                break
+        if words:
+            surname_id = hashlib.sha1(words[-1].lower().encode('utf-8')).hexdigest()[:8]
+            results.append({'mid': f"/m/surname{surname_id}", 'title': words[-1], 'type': 'Surname'})
+        return results
+
+
+class SimulatedTrends(TrendsBackend):
+    """Per-proxy client view onto a shared synthetic population"""
+    def __init__(self, population: SyntheticPopulation, proxies: Optional[List[str]] = None):
+        self.population = population
+        self.proxies = proxies or []
+        self.kw_list: List[str] = []
+
+    def _wait(self):
+        if self.population.latency:
+            time.sleep(random.uniform(0.5, 1.5) * self.population.latency)
+
+    def build_payload(self, kw_list: List[str], cat: int = 0, timeframe: str = 'today 5-y',
+                      geo: str = '', gprop: str = '') -> None:
+        self.kw_list = list(kw_list)
+
+    def interest_over_time(self) -> pd.DataFrame:
+        self._wait()
+        return self.population.interest(self.kw_list)
+
+    def suggestions(self, keyword: str) -> List[Dict]:
+        self._wait()
+        return self.population.suggestions(keyword)
+
+
+_simulation: Optional[SyntheticPopulation] = None
+_simulation_lock = threading.Lock()
+
+
+def get_simulation() -> SyntheticPopulation:
+    """Shared population configured from SIM_* environment variables"""
+    global _simulation
+    with _simulation_lock:
+        if _simulation is None:
+            _simulation = SyntheticPopulation(
+                size=int(os.environ.get('SIM_PLAYERS', 2500)),
+                seed=int(os.environ.get('SIM_SEED', 42)),
+                noise=float(os.environ.get('SIM_NOISE', 0.05)),
+                latency=float(os.environ.get('SIM_LATENCY', 0)),
+                rate_limit_rate=float(os.environ.get('SIM_RATE_LIMIT_RATE', 0)),
+                empty_rate=float(os.environ.get('SIM_EMPTY_RATE', 0)),
+            )
+        return _simulation
+
+
+def set_simulation(population: SyntheticPopulation):
+    """Install a population for all simulated clients, e.g. from a load test"""
+    global _simulation
+    with _simulation_lock:
+        _simulation = population